@@ -0,0 +1,96 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+# ConditionalGetMixin
+# Purpose: Answer repeated GETs with 304 Not Modified when nothing changed
+# - Before serializing, one query computes a validator for the rows the
+#   response would contain: max(updated_at) and the row count for a list,
+#   updated_at of the row for a single object
+# - The validator is sent as an ETag (and Last-Modified for single objects)
+# - If the client's If-None-Match / If-Modified-Since still matches, a 304
+#   is returned without loading or serializing anything
+# Notes:
+#   - max(updated_at) + count catches edits, additions and deletions alike
+#   - Last-Modified is not sent for lists because deletions do not move
+#     max(updated_at); clients should revalidate lists with the ETag
+class ConditionalGetMixin:
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(request, queryset, False, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            # A malformed lookup ("abc" for an integer id); get_object()
+            # turns it into a 404.
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional(request, queryset, True, super().retrieve, *args, **kwargs)
+
+    # Returns (etag, last_modified), or (None, None) for a missing object
+    def get_validators(self, request, queryset, single):
+        if single:
+            state = list(queryset.values_list('pk', 'updated_at')[:1])
+            if not state:
+                return None, None
+        else:
+            stats = queryset.order_by().aggregate(updated=Max('updated_at'), count=Count('pk'))
+            state = sorted(stats.items())
+
+        # The query string is part of the URL, so only the format varies here
+        parts = [request.accepted_renderer.format, state]
+        etag = quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+        # HTTP dates have one-second resolution
+        last_modified = int(state[0][1].timestamp()) if single else None
+        return etag, last_modified
+
+    def _conditional(self, request, queryset, single, handler, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, queryset, single)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+# SparseFieldsetMixin
+# Purpose: Load only the columns a ?fields= subset needs
+# - When the serializer is narrowed (DynamicFieldsMixin in api/serializers.py),
+#   the queryset is narrowed with .only() to the primary key and the model
+#   fields the selected fields read
+# - Ordering still happens in SQL, so ordering fields need not be loaded
+# Notes:
+#   - The queryset is left alone when a field cannot be mapped to a column
+class SparseFieldsetMixin:
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sources = getattr(self.get_serializer(), 'get_sparse_sources', lambda: None)()
+        if sources is None:
+            return queryset
+
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        for name in sources:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return queryset
+            if not field.concrete or field.many_to_many:
+                return queryset
+            columns.add(field.name)
+        return queryset.only(*columns)
@@ -20,12 +20,15 @@ class Author(models.Model):
 #   - author: ForeignKey relationship to Author model
 #     * on_delete=models.CASCADE: if an author is deleted, all their books are deleted too
 #     * related_name='books': allows reverse access from Author to their books (author.books.all())
+#   - updated_at: DateTimeField set automatically on every save
 # Methods:
 #   - __str__: Returns the book's title for readable representation in admin panel and queries
 class Book(models.Model):
       title = models.CharField(max_length=100)
       publication_year = models.IntegerField()
       author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books')
+      # Last change to the row; drives ETag/Last-Modified (see api/mixins.py)
+      updated_at = models.DateTimeField(auto_now=True)
 
       def __str__(self):
           return self.title
\ No newline at end of file
@@ -2,7 +2,41 @@ from rest_framework import serializers
 from .models import Book, Author
 from datetime import date
 
-class BookSerializer(serializers.ModelSerializer):
+# DynamicFieldsMixin
+# Purpose: Let clients ask for a subset of fields with ?fields=id,title
+# - Only GET/HEAD responses are narrowed; create/update use every field
+# - Unknown names are ignored; if none of the names are known, all fields are kept
+# - get_sparse_sources() tells SparseFieldsetMixin (api/mixins.py) which model
+#   fields the selected fields read, so the queryset can load just those columns
+class DynamicFieldsMixin:
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = False
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        requested = {name.strip() for name in request.query_params.get(self.fields_query_param, '').split(',')}
+        selected = requested & set(self.fields)
+        if selected:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+            self.sparse = True
+
+    # Returns the model fields read by the selected fields, or None when the
+    # serializer is not narrowed or a field reads the whole object (source='*')
+    def get_sparse_sources(self):
+        if not self.sparse:
+            return None
+        sources = set()
+        for field in self.fields.values():
+            if field.source == '*':
+                return None
+            sources.add(field.source_attrs[0])
+        return sources
+
+class BookSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # accept author as an ID when creating/updating
     author = serializers.PrimaryKeyRelatedField(queryset=Author.objects.all())
 
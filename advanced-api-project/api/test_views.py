@@ -4,6 +4,8 @@ Covers: list/detail/create/update/delete, plus filtering, search and ordering,
 and permission enforcement (authenticated vs admin).
 """
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -105,4 +107,40 @@ class BookAPITestCase(APITestCase):
         self.assertIn(response2.status_code, (status.HTTP_204_NO_CONTENT, status.HTTP_200_OK))
         # DB assertion is the authoritative check
         self.assertFalse(Book.objects.filter(id=self.book2.id).exists())
-        self.client.logout()
\ No newline at end of file
+        self.client.logout()
+    # Conditional GET
+    def test_list_returns_304_until_books_change(self):
+        response = self.client.get("/api/books/?search=Python")
+        etag = response.headers["ETag"]
+
+        response2 = self.client.get("/api/books/?search=Python", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response2.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # deleting a matching book changes the validator
+        self.book3.delete()
+        response3 = self.client.get("/api/books/?search=Python", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response3.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response3.data), 1)
+
+    def test_detail_returns_304_for_matching_etag(self):
+        response = self.client.get(f"/api/books/{self.book1.id}/")
+        self.assertIn("Last-Modified", response.headers)
+
+        response2 = self.client.get(f"/api/books/{self.book1.id}/", HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(response2.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.book1.title = "Django Basics, 2nd Edition"
+        self.book1.save()
+        response3 = self.client.get(f"/api/books/{self.book1.id}/", HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(response3.status_code, status.HTTP_200_OK)
+
+    # Sparse fieldsets
+    def test_fields_param_limits_fields_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/books/?fields=id,title&ordering=-publication_year")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0], {"id": self.book2.id, "title": "Advanced Python"})
+        # the book query selects neither the year nor the author column
+        selected = queries[-1]["sql"].split(" FROM ")[0]
+        self.assertNotIn("author_id", selected)
+        self.assertNotIn("publication_year", selected)
@@ -4,11 +4,12 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticate
 from rest_framework.exceptions import PermissionDenied
 from django_filters import rest_framework
 from django_filters.rest_framework import DjangoFilterBackend
+from .mixins import ConditionalGetMixin, SparseFieldsetMixin
 from .models import Book
 from .serializers import BookSerializer
 
 # List all books with advanced filtering, search, and ordering capabilities
-class BookListView(generics.ListAPIView):
+class BookListView(ConditionalGetMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     ListView for Book model with advanced query capabilities.
     
@@ -16,6 +17,8 @@ class BookListView(generics.ListAPIView):
     - Filtering by title, author, and publication_year
     - Full-text search on title and author name
     - Ordering by title, publication_year, and author
+    - Conditional GET: ETag, 304 Not Modified when the books are unchanged
+    - Sparse fieldsets: ?fields=id,title returns and loads only those fields
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -38,9 +41,10 @@ class BookListView(generics.ListAPIView):
     ordering = ['title']  # Default ordering by title
 
 # Retrieve a single book by id
-class BookDetailView(generics.RetrieveAPIView):
+class BookDetailView(ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
     """
     DetailView for retrieving a single Book instance by ID.
+    Supports conditional GET (ETag / Last-Modified) and ?fields=.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
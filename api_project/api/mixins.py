@@ -0,0 +1,87 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve.
+
+    One query computes a validator (max(updated_at) and count for lists,
+    the row's updated_at for single objects); a matching If-None-Match or
+    If-Modified-Since gets a 304 without serializing anything.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(request, queryset, False, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            # A malformed lookup ("abc" for an integer id); get_object()
+            # turns it into a 404.
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional(request, queryset, True, super().retrieve, *args, **kwargs)
+
+    def get_validators(self, request, queryset, single):
+        if single:
+            state = list(queryset.values_list('pk', 'updated_at')[:1])
+            if not state:
+                return None, None
+        else:
+            stats = queryset.order_by().aggregate(updated=Max('updated_at'), count=Count('pk'))
+            state = sorted(stats.items())
+
+        # The query string is part of the URL, so only the format varies here
+        parts = [request.accepted_renderer.format, state]
+        etag = quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+        # HTTP dates have one-second resolution
+        last_modified = int(state[0][1].timestamp()) if single else None
+        return etag, last_modified
+
+    def _conditional(self, request, queryset, single, handler, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, queryset, single)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class SparseFieldsetMixin:
+    """
+    Narrows the queryset with .only() when ?fields= narrows the serializer
+    (see api.serializers.DynamicFieldsMixin), to the primary key and the
+    model fields the selected fields read.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sources = getattr(self.get_serializer(), 'get_sparse_sources', lambda: None)()
+        if sources is None:
+            return queryset
+
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        for name in sources:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return queryset
+            if not field.concrete or field.many_to_many:
+                return queryset
+            columns.add(field.name)
+        return queryset.only(*columns)
@@ -7,5 +7,6 @@ from django.db import models
 class Book(models.Model):
    title = models.CharField(max_length=100)
    author = models.CharField(max_length=100)
+   updated_at = models.DateTimeField(auto_now=True)
 
    
@@ -1,7 +1,42 @@
 from rest_framework import serializers
 from .models import Book
 
-class BookSerializer (serializers.ModelSerializer):
+
+class DynamicFieldsMixin:
+  """
+  Lets clients ask for a subset of fields with ``?fields=id,title``.
+
+  Only reads are narrowed and unknown names are ignored. SparseFieldsetMixin
+  (api/mixins.py) loads just the columns the selected fields read.
+  """
+  fields_query_param = 'fields'
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.sparse = False
+    request = self.context.get('request')
+    if request is None or request.method not in ('GET', 'HEAD'):
+      return
+    requested = {name.strip() for name in request.query_params.get(self.fields_query_param, '').split(',')}
+    selected = requested & set(self.fields)
+    if selected:
+      for name in set(self.fields) - selected:
+        self.fields.pop(name)
+      self.sparse = True
+
+  def get_sparse_sources(self):
+    """Model fields read by the selected fields, or None if not narrowed."""
+    if not self.sparse:
+      return None
+    sources = set()
+    for field in self.fields.values():
+      if field.source == '*':
+        return None
+      sources.add(field.source_attrs[0])
+    return sources
+
+
+class BookSerializer (DynamicFieldsMixin, serializers.ModelSerializer):
   class Meta:
     model = Book
     fields =['id', 'title', 'author']
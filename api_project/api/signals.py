@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import authentication
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    # The key is the primary key, which Django clears after a delete.
+    key = instance.key
+    transaction.on_commit(lambda: authentication.invalidate([key]))
+
+
+@receiver(post_save, sender=User)
+def forget_cached_tokens_of_user(sender, instance, created, update_fields, **kwargs):
+    # Cached lookups carry the user, so drop them whenever the user changes
+    # (deactivation above all). Logins only touch last_login.
+    if created or update_fields == frozenset(['last_login']):
+        return
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+    if keys:
+        transaction.on_commit(lambda: authentication.invalidate(keys))
@@ -1,3 +1,86 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from . import authentication
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+   def setUp(self):
+      cache.clear()
+      authentication.local_cache.clear()
+      self.user = User.objects.create_user(username='alice', password='pass123')
+      self.token = Token.objects.create(user=self.user)
+      self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+   def get_books(self):
+      with CaptureQueriesContext(connection) as queries:
+         response = self.client.get(reverse('book_all-list'))
+      return response, len(queries)
+
+   def test_token_lookup_is_cached(self):
+      response, cold = self.get_books()
+      self.assertEqual(response.status_code, status.HTTP_200_OK)
+      response, warm = self.get_books()
+      self.assertEqual(response.status_code, status.HTTP_200_OK)
+      self.assertEqual(warm, cold - 1)
+
+      # A fresh process still finds the lookup in the shared cache.
+      authentication.local_cache.clear()
+      self.assertEqual(self.get_books()[1], warm)
+
+   def test_deactivated_user_is_rejected(self):
+      self.get_books()
+      self.user.is_active = False
+      with self.captureOnCommitCallbacks(execute=True):
+         self.user.save()
+
+      response, _ = self.get_books()
+      self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+   def test_lookup_racing_a_deactivation_is_not_served(self):
+      store = cache.set
+
+      def deactivate_then_store(key, value, timeout=None):
+         # The user is deactivated after the database lookup but before
+         # its result is cached.
+         patcher.stop()
+         self.user.is_active = False
+         with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+         store(key, value, timeout)
+
+      patcher = patch.object(cache, 'set', side_effect=deactivate_then_store)
+      patcher.start()
+      self.assertEqual(self.get_books()[0].status_code, status.HTTP_200_OK)
+
+      self.assertEqual(self.get_books()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+      authentication.local_cache.clear()
+      self.assertEqual(self.get_books()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+
+   def test_logout_revokes_the_token(self):
+      self.get_books()
+      with self.captureOnCommitCallbacks(execute=True):
+         response = self.client.post(reverse('api_logout'))
+      self.assertEqual(response.status_code, status.HTTP_200_OK)
+      self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+      response, _ = self.get_books()
+      self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ConditionalGetTests(APITestCase):
+   def setUp(self):
+      self.user = User.objects.create_user(username='alice', password='pass123')
+      self.client.force_authenticate(user=self.user)
+
+   def test_malformed_id_is_not_found(self):
+      response = self.client.get(reverse('book_all-detail', args=['abc']))
+      self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
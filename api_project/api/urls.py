@@ -1,5 +1,5 @@
 from django.urls import path, include
-from .views import BookViewSet
+from .views import BookViewSet, LogoutView
 from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken.views import obtain_auth_token
 
@@ -11,5 +11,6 @@ urlpatterns = [
     #path('books/', BookList.as_view(), name='book-list'),  # Maps to the BookList view
    
     path('', include(router.urls)),
-    path('auth/token/', obtain_auth_token, name='api_token_auth')
+    path('auth/token/', obtain_auth_token, name='api_token_auth'),
+    path('auth/logout/', LogoutView.as_view(), name='api_logout'),
 ]
\ No newline at end of file
@@ -1,8 +1,12 @@
 from django.shortcuts import render
+from .mixins import ConditionalGetMixin, SparseFieldsetMixin
 from .models import Book
 from .serializers import BookSerializer
 from rest_framework.generics import ListAPIView
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.permissions import IsAuthenticatedOrReadOnly 
 
@@ -12,7 +16,7 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 # serializer_class = BookSerializer
 
 #ViewSets
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
@@ -32,3 +36,11 @@ class PublicReadOnlyBookViewSet(viewsets.ModelViewSet):
    
 
 
+class LogoutView(APIView):
+   """Delete the token used for this request, signing the client out."""
+   permission_classes = [IsAuthenticated]
+
+   def post(self, request):
+      if isinstance(request.auth, Token):
+         Token.objects.filter(key=request.auth.key).delete()
+      return Response({"detail": "Logged out"}, status=status.HTTP_200_OK)
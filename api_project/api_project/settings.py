@@ -126,12 +126,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 REST_FRAMEWORK = {
+        # orjson-backed when installed, stdlib json otherwise (see renderers.py).
+        'DEFAULT_RENDERER_CLASSES': (
+            'api_project.renderers.FastJSONRenderer',
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        ),
+        'DEFAULT_PARSER_CLASSES': (
+            'api_project.renderers.FastJSONParser',
+            'rest_framework.parsers.FormParser',
+            'rest_framework.parsers.MultiPartParser',
+        ),
         'DEFAULT_AUTHENTICATION_CLASSES': (
-            'rest_framework.authentication.TokenAuthentication',
+            'api.authentication.CachedTokenAuthentication',
             'rest_framework.authentication.SessionAuthentication', # Optional, if you also use session authentication
         ),
         'DEFAULT_PERMISSION_CLASSES': (
             'rest_framework.permissions.IsAuthenticated', # Example: require authentication for all views by default
         ),
         # ... other DRF settings
-    }
\ No newline at end of file
+    }
+
+# Token authentication cache (api.authentication)
+# Seconds a token lookup is reused by one process without asking the shared
+# cache; also how long other processes may honour a revoked token.
+TOKEN_AUTH_LOCAL_TTL = 10
+TOKEN_AUTH_LOCAL_MAX_SIZE = 10_000
+# Seconds a token lookup is kept in the shared cache.
+TOKEN_AUTH_CACHE_TTL = 300
@@ -0,0 +1,127 @@
+"""
+Token authentication without a database round trip per request.
+
+``CachedTokenAuthentication`` behaves like DRF's ``TokenAuthentication`` but
+remembers token -> user lookups: first in a small per-process LRU whose
+entries live ``TOKEN_AUTH_LOCAL_TTL`` seconds, then in the shared cache for
+``TOKEN_AUTH_CACHE_TTL`` seconds, and only then in the database. Entries
+are stored pickled and unpickled per request, so requests never share a
+user instance.
+
+Deleting a token (logout, rotation) or saving its user (deactivation,
+password change) calls ``invalidate``, which drops this process's local
+entry and bumps the token's version in the shared cache; other processes
+stop using their local entries within ``TOKEN_AUTH_LOCAL_TTL`` seconds.
+Shared entries carry the version read before the database lookup, so a
+lookup that raced with an invalidation is stored under an outdated version
+and never served. Cache keys are hashes of the token, so the shared cache
+never holds usable credentials.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cache_key(key):
+    return 'authtoken:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def _version_key(cache_key):
+    return cache_key + ':version'
+
+
+def _cache_timeout():
+    return _setting('TOKEN_AUTH_CACHE_TTL', 300)
+
+
+class _LocalCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # cache key -> (expires_at, pickled token)
+        self._entries = OrderedDict()
+        # Bumped by every invalidation, see set().
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, generation):
+        """Store ``value`` unless anything was invalidated since ``generation`` was read."""
+        ttl = _setting('TOKEN_AUTH_LOCAL_TTL', 10)
+        max_size = _setting('TOKEN_AUTH_LOCAL_MAX_SIZE', 10_000)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = _LocalCache()
+
+
+def invalidate(keys):
+    """Forget cached lookups for the given token keys."""
+    cache_keys = [_cache_key(key) for key in keys]
+    local_cache.delete_many(cache_keys)
+    # A fresh clock reading never matches a version read earlier.
+    cache.set_many({_version_key(cache_key): time.time_ns() for cache_key in cache_keys}, _cache_timeout())
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        packed = local_cache.get(cache_key)
+        if packed is None:
+            # Both are read before the database; see the module docstring.
+            generation = local_cache.generation
+            version_key = _version_key(cache_key)
+            values = cache.get_many([cache_key, version_key])
+            version = values.get(version_key)
+            if version is None:
+                version = time.time_ns()
+                if not cache.add(version_key, version, _cache_timeout()):
+                    version = cache.get(version_key)
+
+            entry = values.get(cache_key)
+            if entry is not None and entry[0] == version:
+                packed = entry[1]
+            else:
+                user, token = super().authenticate_credentials(key)
+                packed = pickle.dumps(token)
+                if version is not None:
+                    cache.set(cache_key, (version, packed), _cache_timeout())
+            local_cache.set(cache_key, packed, generation)
+
+        # Inactive users are rejected by the database lookup and never cached.
+        token = pickle.loads(packed)
+        return (token.user, token)
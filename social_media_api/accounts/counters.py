@@ -0,0 +1,86 @@
+"""
+Denormalized follower/following counts on ``CustomUser``.
+
+Every follow or unfollow, whichever side of the relation it came through,
+reaches ``users_followed``/``users_unfollowed`` (see ``accounts.signals``)
+and is applied here with ``UPDATE ... SET n = n + delta`` statements, so
+concurrent follows never lose increments. Counts can be recomputed from the
+follow table with ``reconcile_follow_counts``.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import CustomUser
+
+Follow = CustomUser.followers.through
+
+# Counter field -> through-table column holding the user it belongs to.
+COUNTERS = {
+    'follower_count': 'from_customuser',
+    'following_count': 'to_customuser',
+}
+
+
+def adjust_counts(edges, sign):
+    """
+    Add ``sign`` (1 or -1) per edge to both users' counts.
+
+    Users with the same delta share one ``UPDATE``, so following many users
+    at once costs a handful of statements rather than one per user.
+    """
+    for field, deltas in (
+        ('following_count', Counter(follower_id for follower_id, _ in edges)),
+        ('follower_count', Counter(followee_id for _, followee_id in edges)),
+    ):
+        by_delta = defaultdict(list)
+        for user_id, n in deltas.items():
+            by_delta[n * sign].append(user_id)
+        for delta, user_ids in by_delta.items():
+            CustomUser.objects.filter(pk__in=user_ids).update(**{field: F(field) + delta})
+
+
+def _actual_count(column):
+    counts = (
+        Follow.objects
+        .filter(**{column: OuterRef('pk')})
+        .order_by()
+        .values(column)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def reconcile_counts(start_id, batch_size):
+    """
+    Recompute counts for up to ``batch_size`` users with ``pk > start_id``.
+
+    Returns ``(last_id, fixed)``: the highest primary key examined (``None``
+    once there are no users left) and the number of users whose counts had
+    drifted and were rewritten.
+    """
+    users = list(
+        CustomUser.objects
+        .filter(pk__gt=start_id)
+        .order_by('pk')
+        .annotate(**{f'actual_{field}': _actual_count(column) for field, column in COUNTERS.items()})
+        .only('pk', *COUNTERS)[:batch_size]
+    )
+    if not users:
+        return None, 0
+
+    drifted = []
+    for user in users:
+        changed = False
+        for field in COUNTERS:
+            actual = getattr(user, f'actual_{field}')
+            if getattr(user, field) != actual:
+                setattr(user, field, actual)
+                changed = True
+        if changed:
+            drifted.append(user)
+
+    CustomUser.objects.bulk_update(drifted, list(COUNTERS))
+    return users[-1].pk, len(drifted)
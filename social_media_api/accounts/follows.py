@@ -0,0 +1,46 @@
+"""
+Following many users in one request.
+
+``follow_many`` works out which of the requested follows are new with one
+query, inserts them with a single ``bulk_create`` and sends one
+``users_followed`` signal carrying every new edge. Counters, timelines,
+the follower graph and notifications all handle the batch in one go.
+"""
+from django.db import transaction
+
+from .models import CustomUser
+from .signals import users_followed
+
+Follow = CustomUser.followers.through
+
+
+def follow_many(user, user_ids):
+    """
+    Make ``user`` follow every id in ``user_ids``; returns the ids newly followed.
+
+    Ids of users already followed, and ``user``'s own id, are skipped.
+    """
+    user_ids = set(user_ids) - {user.pk}
+    if not user_ids:
+        return set()
+
+    with transaction.atomic():
+        existing = set(
+            Follow.objects
+            .filter(to_customuser_id=user.pk, from_customuser_id__in=user_ids)
+            .values_list('from_customuser_id', flat=True)
+        )
+        new_ids = user_ids - existing
+        # ignore_conflicts keeps a concurrent follow of the same user from
+        # failing the batch; the rare double count it allows is fixed by
+        # reconcile_follow_counts.
+        Follow.objects.bulk_create(
+            (Follow(from_customuser_id=followee_id, to_customuser_id=user.pk) for followee_id in new_ids),
+            ignore_conflicts=True,
+        )
+        if new_ids:
+            users_followed.send(
+                sender=CustomUser,
+                edges=[(user.pk, followee_id) for followee_id in sorted(new_ids)],
+            )
+    return new_ids
@@ -0,0 +1,250 @@
+"""
+In-process follower graph index.
+
+Adjacency lists are kept per user as sorted ``array('q')`` buffers, which
+cost 8 bytes per edge, in an LRU that is capped by total edge count
+(``FOLLOW_GRAPH_MAX_EDGES``). So "does A follow B", "who does A follow"
+and "mutual follows" are answered by a binary search or a sorted merge in
+memory instead of a query on the through table.
+
+A list that is not resident is loaded from the shared cache, where
+``rebuild_follower_graph`` and earlier loads leave packed snapshots, and
+from the database only after that. Snapshots are keyed on a per-list
+version: follow/unfollow signals update resident lists in place and bump
+the versions of the users involved, so a snapshot built from a read that
+raced with the change is written under a version nobody reads any more.
+Lists in other processes are refreshed once they are
+``FOLLOW_GRAPH_LOCAL_TTL`` seconds old, so reads are eventually
+consistent. Never use the graph to decide whether a write is needed.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CustomUser
+
+Follow = CustomUser.followers.through
+
+FOLLOWING = 'following'
+FOLLOWERS = 'followers'
+
+# Through-table columns per direction: (owner column, neighbour column).
+# ``to_customuser`` is the follower and ``from_customuser`` the followee.
+_COLUMNS = {
+    FOLLOWING: ('to_customuser_id', 'from_customuser_id'),
+    FOLLOWERS: ('from_customuser_id', 'to_customuser_id'),
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _version_key(direction, user_id):
+    return f'followgraph:version:{direction}:{user_id}'
+
+
+def _cache_key(direction, user_id, version):
+    return f'followgraph:{direction}:{user_id}:{version}'
+
+
+def _versions(keys):
+    """Current versions for ``keys``, creating missing ones."""
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        # A version created after eviction must not collide with one used
+        # before, so start from the clock rather than from 1.
+        for key in missing:
+            cache.add(key, time.time_ns(), None)
+        values.update(cache.get_many(missing))
+    return values
+
+
+class FollowerGraph:
+    def __init__(self, max_edges=None, local_ttl=None):
+        self.max_edges = max_edges or _setting('FOLLOW_GRAPH_MAX_EDGES', 2_000_000)
+        self.local_ttl = local_ttl if local_ttl is not None else _setting('FOLLOW_GRAPH_LOCAL_TTL', 30)
+        self._lock = threading.RLock()
+        # (direction, user_id) -> (loaded_at, sorted array of neighbour ids)
+        self._lists = OrderedDict()
+        self._edges = 0
+
+    # Queries
+
+    def following(self, user_id):
+        """Sorted ids of the users ``user_id`` follows. Do not mutate."""
+        return self._get(FOLLOWING, user_id)
+
+    def followers(self, user_id):
+        """Sorted ids of the users following ``user_id``. Do not mutate."""
+        return self._get(FOLLOWERS, user_id)
+
+    def is_following(self, follower_id, followee_id):
+        ids = self.following(follower_id)
+        position = bisect_left(ids, followee_id)
+        return position < len(ids) and ids[position] == followee_id
+
+    def mutual(self, user_id):
+        """Ids of users that ``user_id`` follows and who follow back."""
+        return _intersect(self.following(user_id), self.followers(user_id))
+
+    def stats(self):
+        with self._lock:
+            return {'lists': len(self._lists), 'edges': self._edges, 'bytes': self._edges * 8}
+
+    # Maintenance
+
+    def apply(self, edges, added):
+        """Apply follow (``added=True``) or unfollow edges to resident lists."""
+        stale = set()
+        with self._lock:
+            for follower_id, followee_id in edges:
+                for direction, owner, neighbour in (
+                    (FOLLOWING, follower_id, followee_id),
+                    (FOLLOWERS, followee_id, follower_id),
+                ):
+                    stale.add(_version_key(direction, owner))
+                    entry = self._lists.get((direction, owner))
+                    if entry is None:
+                        continue
+                    ids = entry[1]
+                    position = bisect_left(ids, neighbour)
+                    present = position < len(ids) and ids[position] == neighbour
+                    if added and not present:
+                        insort(ids, neighbour)
+                        self._edges += 1
+                    elif not added and present:
+                        del ids[position]
+                        self._edges -= 1
+            self._evict()
+        if stale:
+            # One round trip however many users a bulk follow touched; a
+            # fresh clock reading is as good as an increment here.
+            cache.set_many(dict.fromkeys(stale, time.time_ns()), None)
+
+    def clear(self):
+        with self._lock:
+            self._lists.clear()
+            self._edges = 0
+
+    def rebuild(self, batch_size=1000):
+        """
+        Write fresh snapshots of every adjacency list to the shared cache.
+
+        Works through owners ``batch_size`` at a time in each direction,
+        reading their versions before their edges, so a follow committed
+        meanwhile leaves the snapshot under an outdated version. Returns
+        ``(lists, edges)`` written.
+        """
+        self.clear()
+        lists = edges = 0
+        for direction, (owner_column, neighbour_column) in _COLUMNS.items():
+            last_owner = 0
+            while True:
+                owners = list(
+                    Follow.objects
+                    .filter(**{f'{owner_column}__gt': last_owner})
+                    .order_by(owner_column)
+                    .values_list(owner_column, flat=True)
+                    .distinct()[:batch_size]
+                )
+                if not owners:
+                    break
+                last_owner = owners[-1]
+                versions = _versions([_version_key(direction, owner) for owner in owners])
+
+                adjacency = {owner: array('q') for owner in owners}
+                rows = (
+                    Follow.objects
+                    .filter(**{f'{owner_column}__in': owners})
+                    .order_by(owner_column, neighbour_column)
+                    .values_list(owner_column, neighbour_column)
+                )
+                for owner, neighbour in rows:
+                    adjacency[owner].append(neighbour)
+                    edges += 1
+                cache.set_many(
+                    {
+                        _cache_key(direction, owner, versions[_version_key(direction, owner)]): ids.tobytes()
+                        for owner, ids in adjacency.items()
+                    },
+                    self._cache_timeout(),
+                )
+                lists += len(owners)
+        # Users with no edges are absent from the snapshots and fall back to
+        # a (cheap, empty) database read on first use.
+        return lists, edges // 2
+
+    # Internals
+
+    def _cache_timeout(self):
+        return _setting('FOLLOW_GRAPH_CACHE_TTL', 24 * 60 * 60)
+
+    def _get(self, direction, user_id):
+        key = (direction, user_id)
+        with self._lock:
+            entry = self._lists.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.local_ttl:
+                self._lists.move_to_end(key)
+                return entry[1]
+
+        ids = self._load(direction, user_id)
+        with self._lock:
+            previous = self._lists.pop(key, None)
+            if previous is not None:
+                self._edges -= len(previous[1])
+            self._lists[key] = (time.monotonic(), ids)
+            self._edges += len(ids)
+            self._evict()
+        return ids
+
+    def _load(self, direction, user_id):
+        # The version is read before the database, see the module docstring.
+        version = _versions([_version_key(direction, user_id)])[_version_key(direction, user_id)]
+        key = _cache_key(direction, user_id, version)
+        packed = cache.get(key)
+        ids = array('q')
+        if packed is not None:
+            ids.frombytes(packed)
+            return ids
+
+        owner_column, neighbour_column = _COLUMNS[direction]
+        ids.extend(
+            Follow.objects
+            .filter(**{owner_column: user_id})
+            .order_by(neighbour_column)
+            .values_list(neighbour_column, flat=True)
+        )
+        cache.set(key, ids.tobytes(), self._cache_timeout())
+        return ids
+
+    def _evict(self):
+        # Drop least recently used lists until within budget, always keeping
+        # the most recent one even if it alone exceeds the budget.
+        while self._edges > self.max_edges and len(self._lists) > 1:
+            _, (_, ids) = self._lists.popitem(last=False)
+            self._edges -= len(ids)
+
+
+def _intersect(left, right):
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] == right[j]:
+            result.append(left[i])
+            i += 1
+            j += 1
+        elif left[i] < right[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+graph = FollowerGraph()
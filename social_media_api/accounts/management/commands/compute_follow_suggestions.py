@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from accounts.suggestions import compute_suggestions
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed \"people you may know\" suggestions for every user."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Users processed per batch.",
+        )
+        parser.add_argument(
+            '--per-user',
+            type=int,
+            default=None,
+            help="Suggestions kept per user (defaults to FOLLOW_SUGGESTIONS_PER_USER).",
+        )
+
+    def handle(self, *args, **options):
+        users, suggestions = compute_suggestions(
+            batch_size=options['batch_size'],
+            per_user=options['per_user'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {suggestions} suggestions for {users} users."
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from accounts.graph import graph
+
+
+class Command(BaseCommand):
+    help = "Rebuild the follower graph snapshots held in the shared cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Rows fetched and snapshots written per round trip.",
+        )
+
+    def handle(self, *args, **options):
+        lists, edges = graph.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt follower graph: {edges} follow edges in {lists} adjacency lists."
+        ))
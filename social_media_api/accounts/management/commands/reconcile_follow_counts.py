@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from accounts.counters import reconcile_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute drifted follower/following counts on users in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of users checked per batch.",
+        )
+
+    def handle(self, *args, **options):
+        last_id = 0
+        fixed = 0
+
+        while True:
+            last_id, drifted = reconcile_counts(last_id, options['batch_size'])
+            if last_id is None:
+                break
+            fixed += drifted
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled follow counts, {fixed} users corrected."))
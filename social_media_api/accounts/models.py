@@ -8,5 +8,28 @@ class CustomUser(AbstractUser):
 
   followers = models.ManyToManyField('self', symmetrical=False, related_name='following', blank=True)
 
+  # Denormalized sizes of ``followers`` and ``following``, see accounts.counters.
+  follower_count = models.PositiveIntegerField(default=0)
+  following_count = models.PositiveIntegerField(default=0)
+
   def __str__(self):
     return self.username
+
+
+class FollowSuggestion(models.Model):
+  """Precomputed "people you may know" entry, see accounts.suggestions."""
+  user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='follow_suggestions')
+  suggested = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+  score = models.FloatField()
+  # How many of the people ``user`` follows already follow ``suggested``.
+  mutual_count = models.PositiveIntegerField()
+  computed_at = models.DateTimeField()
+
+  class Meta:
+    unique_together = ('user', 'suggested')
+    indexes = [
+      models.Index(fields=['user', '-score'], name='suggestion_user_score_idx'),
+    ]
+
+  def __str__(self):
+    return f"{self.suggested} for {self.user}"
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 
+from .graph import graph
+from .models import FollowSuggestion
+
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -33,4 +37,43 @@ class LoginSerializer(serializers.Serializer):
       if not user:
          raise serializers.ValidationError("Invalid credentials")
       data['user'] = user
-      return data
\ No newline at end of file
+      return data
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+  class Meta:
+    model = get_user_model()
+    fields = ['id', 'username', 'bio', 'profile_picture']
+
+
+class BulkFollowSerializer(serializers.Serializer):
+  usernames = serializers.ListField(
+    child=serializers.CharField(max_length=150),
+    allow_empty=False,
+    max_length=getattr(settings, 'FOLLOW_BULK_MAX_USERNAMES', 500),
+  )
+
+
+class ProfileSerializer(serializers.ModelSerializer):
+  is_following = serializers.SerializerMethodField()
+
+  class Meta:
+    model = get_user_model()
+    fields = ['id', 'username', 'bio', 'profile_picture', 'follower_count', 'following_count', 'is_following']
+    read_only_fields = fields
+
+  def get_is_following(self, obj):
+    # Whether the viewer follows this user, answered from the in-process
+    # follower graph; null on the viewer's own profile.
+    request = self.context.get('request')
+    if request is None or request.user.pk == obj.pk:
+      return None
+    return graph.is_following(request.user.pk, obj.pk)
+
+
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+  user = UserSummarySerializer(source='suggested', read_only=True)
+
+  class Meta:
+    model = FollowSuggestion
+    fields = ['user', 'mutual_count', 'score', 'computed_at']
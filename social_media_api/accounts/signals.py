@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+
+from . import authentication
+from .counters import adjust_counts
+from .models import CustomUser
+
+# Sent with ``edges``: a list of (follower_id, followee_id) tuples that were
+# actually created or removed, whichever side of the relation was used.
+users_followed = Signal()
+users_unfollowed = Signal()
+
+Follow = CustomUser.followers.through
+
+
+def _edges(instance, reverse, pk_set):
+    # ``a.followers.add(b)`` stores (from=a, to=b), i.e. b follows a.
+    # ``u.following.add(x)`` is the reverse accessor for the same row.
+    if reverse:
+        return [(instance.pk, pk) for pk in pk_set]
+    return [(pk, instance.pk) for pk in pk_set]
+
+
+def _existing_edges(instance, reverse, pk_set=None):
+    if reverse:
+        rows = Follow.objects.filter(to_customuser_id=instance.pk)
+        if pk_set is not None:
+            rows = rows.filter(from_customuser_id__in=pk_set)
+    else:
+        rows = Follow.objects.filter(from_customuser_id=instance.pk)
+        if pk_set is not None:
+            rows = rows.filter(to_customuser_id__in=pk_set)
+    return list(rows.values_list('to_customuser_id', 'from_customuser_id'))
+
+
+@receiver(m2m_changed, sender=Follow)
+def follow_graph_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add' and pk_set:
+        # Django only reports the rows it actually inserted for post_add.
+        users_followed.send(sender=CustomUser, edges=_edges(instance, reverse, pk_set))
+    elif action == 'pre_remove' and pk_set:
+        # post_remove reports every requested id, so work out beforehand
+        # which edges really exist.
+        instance._removed_follow_edges = _existing_edges(instance, reverse, pk_set)
+    elif action == 'pre_clear':
+        instance._removed_follow_edges = _existing_edges(instance, reverse)
+    elif action in ('post_remove', 'post_clear'):
+        edges = getattr(instance, '_removed_follow_edges', None)
+        instance._removed_follow_edges = None
+        if edges:
+            users_unfollowed.send(sender=CustomUser, edges=edges)
+
+
+@receiver(users_followed)
+def increment_follow_counts(sender, edges, **kwargs):
+    # Runs inside the atomic block Django wraps around the m2m write, so the
+    # counts commit (or roll back) together with the follow rows.
+    adjust_counts(edges, 1)
+
+
+@receiver(users_unfollowed)
+def decrement_follow_counts(sender, edges, **kwargs):
+    adjust_counts(edges, -1)
+
+
+@receiver(users_followed)
+def add_edges_to_graph(sender, edges, **kwargs):
+    from .graph import graph
+    transaction.on_commit(lambda: graph.apply(edges, added=True))
+
+
+@receiver(users_unfollowed)
+def remove_edges_from_graph(sender, edges, **kwargs):
+    from .graph import graph
+    transaction.on_commit(lambda: graph.apply(edges, added=False))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    # The key is the primary key, which Django clears after a delete.
+    key = instance.key
+    transaction.on_commit(lambda: authentication.invalidate([key]))
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_cached_tokens_of_user(sender, instance, created, update_fields, **kwargs):
+    # Cached lookups carry the user, so drop them whenever the user changes
+    # (deactivation above all). Logins only touch last_login.
+    if created or update_fields == frozenset(['last_login']):
+        return
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+    if keys:
+        transaction.on_commit(lambda: authentication.invalidate(keys))
@@ -0,0 +1,130 @@
+"""
+Precomputed "people you may know" suggestions.
+
+``compute_suggestions`` walks the follow graph offline, one batch of users at
+a time: it loads who the batch follows and who those people follow (two
+queries per batch), counts how many of a user's followees follow each
+second-degree candidate, and weights that count by how recently the
+candidate posted. The top ``FOLLOW_SUGGESTIONS_PER_USER`` candidates replace
+the user's stored ``FollowSuggestion`` rows, so serving them is a single
+indexed read on ``(user, -score)``.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import CustomUser, FollowSuggestion
+
+Follow = CustomUser.followers.through
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _chunks(ids, size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _following_of(user_ids, batch_size):
+    following = defaultdict(set)
+    for chunk in _chunks(user_ids, batch_size):
+        rows = Follow.objects.filter(to_customuser_id__in=chunk).values_list(
+            'to_customuser_id', 'from_customuser_id'
+        )
+        for follower_id, followee_id in rows:
+            following[follower_id].add(followee_id)
+    return following
+
+
+def _recency(user_ids, now, batch_size):
+    """Map user id to a weight in (0, 1] that halves every half-life since their last post."""
+    half_life = _setting('FOLLOW_SUGGESTION_RECENCY_HALF_LIFE', 14 * 24 * 60 * 60)
+    weights = {}
+    for chunk in _chunks(user_ids, batch_size):
+        rows = (
+            CustomUser.objects
+            .filter(pk__in=chunk, posts__isnull=False)
+            .annotate(last_post=Max('posts__created_at'))
+            .values_list('pk', 'last_post')
+        )
+        for pk, last_post in rows:
+            age = max((now - last_post).total_seconds(), 0)
+            weights[pk] = 0.5 ** (age / half_life)
+    return weights
+
+
+def suggest_for_batch(user_ids, batch_size=500, per_user=None, now=None):
+    """Compute suggestions for ``user_ids`` and return ``FollowSuggestion`` instances (unsaved)."""
+    per_user = per_user or _setting('FOLLOW_SUGGESTIONS_PER_USER', 20)
+    now = now or timezone.now()
+
+    following = _following_of(user_ids, batch_size)
+    followees = set().union(*following.values()) if following else set()
+    second_hop = _following_of(followees, batch_size)
+
+    counts = {}
+    for user_id in user_ids:
+        direct = following.get(user_id, set())
+        mutual = Counter()
+        for followee_id in direct:
+            mutual.update(second_hop.get(followee_id, ()))
+        for excluded in direct | {user_id}:
+            mutual.pop(excluded, None)
+        if mutual:
+            counts[user_id] = mutual
+
+    candidates = set().union(*(mutual.keys() for mutual in counts.values())) if counts else set()
+    recency = _recency(candidates, now, batch_size)
+
+    suggestions = []
+    for user_id, mutual in counts.items():
+        scored = (
+            (mutual_count * (1 + recency.get(candidate, 0)), mutual_count, candidate)
+            for candidate, mutual_count in mutual.items()
+        )
+        for score, mutual_count, candidate in heapq.nlargest(per_user, scored):
+            suggestions.append(FollowSuggestion(
+                user_id=user_id,
+                suggested_id=candidate,
+                score=score,
+                mutual_count=mutual_count,
+                computed_at=now,
+            ))
+    return suggestions
+
+
+def compute_suggestions(batch_size=500, per_user=None):
+    """
+    Recompute stored suggestions for every user, ``batch_size`` users at a time.
+
+    Each batch's rows are replaced in one transaction, so readers see either
+    the old or the new suggestions. Returns ``(users, suggestions)`` written.
+    """
+    now = timezone.now()
+    users = written = 0
+    last_id = 0
+    while True:
+        user_ids = list(
+            CustomUser.objects
+            .filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        suggestions = suggest_for_batch(user_ids, batch_size, per_user, now)
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+            FollowSuggestion.objects.bulk_create(suggestions, batch_size=batch_size)
+        users += len(user_ids)
+        written += len(suggestions)
+    return users, written
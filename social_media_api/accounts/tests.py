@@ -1,3 +1,304 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from notifications.models import NotificationEvent
+from posts.models import Post, TimelineEntry
+
+from . import authentication
+from .graph import FollowerGraph, graph
+from .models import FollowSuggestion
+
+User = get_user_model()
+
+
+class FollowerGraphTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        graph.clear()
+        self.alice, self.bob, self.carol = (
+            User.objects.create_user(username=name, password='pass123')
+            for name in ('alice', 'bob', 'carol')
+        )
+
+    def follow(self, follower, *followees):
+        with self.captureOnCommitCallbacks(execute=True):
+            follower.following.add(*followees)
+
+    def test_queries_answered_in_memory_after_first_load(self):
+        self.follow(self.alice, self.bob, self.carol)
+        self.follow(self.bob, self.alice)
+
+        self.assertEqual(list(graph.following(self.alice.pk)), sorted([self.bob.pk, self.carol.pk]))
+        graph.followers(self.alice.pk)
+        graph.following(self.bob.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(graph.is_following(self.alice.pk, self.bob.pk))
+            self.assertFalse(graph.is_following(self.bob.pk, self.carol.pk))
+            self.assertEqual(graph.mutual(self.alice.pk), [self.bob.pk])
+        self.assertEqual(len(queries), 0)
+
+    def test_follow_and_unfollow_update_resident_lists(self):
+        graph.following(self.alice.pk)
+        self.follow(self.alice, self.bob)
+        self.assertTrue(graph.is_following(self.alice.pk, self.bob.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.following.remove(self.bob)
+        self.assertFalse(graph.is_following(self.alice.pk, self.bob.pk))
+
+    def test_snapshot_from_a_read_racing_a_follow_is_not_served(self):
+        reader = FollowerGraph()
+        store = cache.set
+
+        def follow_then_store(key, value, timeout=None):
+            # The follow commits after reader's database read but before it
+            # writes its snapshot.
+            patcher.stop()
+            self.follow(self.alice, self.bob)
+            store(key, value, timeout)
+
+        patcher = patch.object(cache, 'set', side_effect=follow_then_store)
+        patcher.start()
+        self.assertEqual(list(reader.following(self.alice.pk)), [])
+
+        # Another process loading the list does not get the stale snapshot.
+        self.assertEqual(list(FollowerGraph().following(self.alice.pk)), [self.bob.pk])
+
+    def test_bulk_follow_bumps_versions_in_one_round_trip(self):
+        with patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            self.follow(self.alice, self.bob, self.carol)
+        bumps = [call.args[0] for call in set_many.call_args_list if any('version' in key for key in call.args[0])]
+        self.assertEqual(len(bumps), 1)
+        # Alice's following list and the two followers lists.
+        self.assertEqual(len(bumps[0]), 3)
+
+    def test_memory_is_bounded_by_edge_budget(self):
+        self.follow(self.alice, self.bob, self.carol)
+        self.follow(self.bob, self.carol)
+        small = FollowerGraph(max_edges=2)
+        small.following(self.alice.pk)
+        small.following(self.bob.pk)
+        self.assertLessEqual(small.stats()['edges'], 2)
+
+    def test_rebuild_command_snapshots_into_cache(self):
+        self.follow(self.alice, self.bob, self.carol)
+        cache.clear()
+        call_command('rebuild_follower_graph', stdout=StringIO())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(FollowerGraph().followers(self.bob.pk)), 1)
+        self.assertEqual(len(queries), 0)
+
+
+class FollowSuggestionTests(APITestCase):
+    def setUp(self):
+        names = ('alice', 'bob', 'carol', 'dave', 'erin')
+        self.alice, self.bob, self.carol, self.dave, self.erin = (
+            User.objects.create_user(username=name, password='pass123') for name in names
+        )
+        self.alice.following.add(self.bob, self.carol)
+        self.bob.following.add(self.dave, self.erin, self.alice)
+        self.carol.following.add(self.dave, self.erin)
+        Post.objects.create(author=self.dave, title='Recent', content='...')
+
+    def suggestions(self):
+        self.client.force_authenticate(user=self.alice)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('follow-suggestions'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        return [(row['user']['username'], row['mutual_count']) for row in response.data]
+
+    def test_second_degree_connections_are_ranked(self):
+        call_command('compute_follow_suggestions', batch_size=2, stdout=StringIO())
+
+        # Both are followed by two of alice's followees; dave posted recently.
+        self.assertEqual(self.suggestions(), [('dave', 2), ('erin', 2)])
+        self.assertFalse(FollowSuggestion.objects.filter(user=self.alice, suggested=self.bob).exists())
+
+    def test_recompute_replaces_rows_and_followed_users_are_hidden(self):
+        call_command('compute_follow_suggestions', stdout=StringIO())
+        self.alice.following.add(self.erin)
+        self.assertEqual(self.suggestions(), [('dave', 2)])
+
+        call_command('compute_follow_suggestions', stdout=StringIO())
+        self.assertEqual(
+            list(FollowSuggestion.objects.filter(user=self.alice).values_list('suggested__username', flat=True)),
+            ['dave'],
+        )
+
+
+class FollowCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        graph.clear()
+        self.alice, self.bob, self.carol = (
+            User.objects.create_user(username=name, password='pass123')
+            for name in ('alice', 'bob', 'carol')
+        )
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return user.follower_count, user.following_count
+
+    def test_counts_follow_either_side_of_the_relation(self):
+        self.client.force_authenticate(user=self.alice)
+        self.client.post(reverse('follow-user', args=[self.bob.id]))
+        self.client.post(reverse('follow-user', args=[self.bob.id]))
+        self.carol.followers.add(self.alice, self.bob)
+        self.assertEqual(self.counts(self.alice), (0, 2))
+        self.assertEqual(self.counts(self.carol), (2, 0))
+
+        self.client.post(reverse('unfollow-user', args=[self.bob.id]))
+        self.client.post(reverse('unfollow-user', args=[self.bob.id]))
+        self.carol.followers.clear()
+        self.assertEqual(self.counts(self.alice), (0, 0))
+        self.assertEqual(self.counts(self.bob), (0, 0))
+        self.assertEqual(self.counts(self.carol), (0, 0))
+
+    def test_profile_reads_counters_without_counting_follows(self):
+        self.bob.following.add(self.alice)
+        self.carol.following.add(self.alice)
+        self.client.force_authenticate(user=self.bob)
+        # Bob's list is resident after his first profile view.
+        graph.following(self.bob.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user-profile', args=[self.alice.id]))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual((response.data['follower_count'], response.data['following_count']), (2, 0))
+        self.assertTrue(response.data['is_following'])
+
+        response = self.client.get(reverse('my-profile'))
+        self.assertEqual(response.data['username'], 'bob')
+        self.assertIsNone(response.data['is_following'])
+
+    def test_profile_shows_follows_made_in_this_process(self):
+        self.client.force_authenticate(user=self.alice)
+        url = reverse('user-profile', args=[self.bob.id])
+        self.assertFalse(self.client.get(url).data['is_following'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('follow-user', args=[self.bob.id]))
+        self.assertTrue(self.client.get(url).data['is_following'])
+
+    def test_reconcile_command_fixes_drift(self):
+        self.alice.following.add(self.bob)
+        User.objects.filter(pk=self.alice.pk).update(follower_count=5, following_count=0)
+
+        call_command('reconcile_follow_counts', batch_size=1, stdout=StringIO())
+        self.assertEqual(self.counts(self.alice), (0, 1))
+        self.assertEqual(self.counts(self.bob), (1, 0))
+
+
+class BulkFollowTests(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass123')
+        self.others = [
+            User.objects.create_user(username=f'user{i}', password='pass123') for i in range(12)
+        ]
+        self.client.force_authenticate(user=self.alice)
+
+    def bulk_follow(self, usernames):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('bulk-follow'), {'usernames': usernames}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, len(queries)
+
+    def test_new_follows_are_written_and_reported(self):
+        self.alice.following.add(self.others[0])
+        Post.objects.create(author=self.others[1], title='Hello', content='...')
+        NotificationEvent.objects.all().delete()
+
+        data, _ = self.bulk_follow(['user0', 'user1', 'user2', 'alice', 'ghost'])
+
+        self.assertEqual(data, {
+            'followed': ['user1', 'user2'],
+            'skipped': ['alice', 'user0'],
+            'not_found': ['ghost'],
+        })
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.following_count, 3)
+        self.assertEqual(set(self.alice.following.values_list('username', flat=True)), {'user0', 'user1', 'user2'})
+        self.assertTrue(TimelineEntry.objects.filter(user=self.alice, post__title='Hello').exists())
+        self.assertEqual(NotificationEvent.objects.filter(actor=self.alice).count(), 2)
+
+    def test_query_count_does_not_grow_with_usernames(self):
+        _, few = self.bulk_follow(['user0', 'user1'])
+        _, many = self.bulk_follow([user.username for user in self.others[2:]])
+        self.assertEqual(few, many)
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        authentication.local_cache.clear()
+        self.user = User.objects.create_user(username='alice', password='pass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('my-profile'))
+        return response, len(queries)
+
+    def test_token_lookup_is_cached(self):
+        response, cold = self.get_profile()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response, warm = self.get_profile()
+        self.assertEqual(response.data['username'], 'alice')
+        self.assertEqual(warm, cold - 1)
+
+        # A fresh process still finds the lookup in the shared cache.
+        authentication.local_cache.clear()
+        self.assertEqual(self.get_profile()[1], warm)
+
+    def test_deactivated_user_is_rejected(self):
+        self.get_profile()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response, _ = self.get_profile()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_lookup_racing_a_deactivation_is_not_served(self):
+        store = cache.set
+
+        def deactivate_then_store(key, value, timeout=None):
+            # The user is deactivated after the database lookup but before
+            # its result is cached.
+            patcher.stop()
+            self.user.is_active = False
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.save()
+            store(key, value, timeout)
+
+        patcher = patch.object(cache, 'set', side_effect=deactivate_then_store)
+        patcher.start()
+        self.assertEqual(self.get_profile()[0].status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.get_profile()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+        authentication.local_cache.clear()
+        self.assertEqual(self.get_profile()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_the_token(self):
+        self.get_profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
 
-# Create your tests here.
+        response, _ = self.get_profile()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
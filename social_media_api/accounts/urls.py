@@ -1,9 +1,14 @@
 from django.urls import path
-from .views import RegisterView, LoginView, FollowUserView, UnfollowUserView
+from .views import RegisterView, LoginView, LogoutView, ProfileView, FollowUserView, BulkFollowView, UnfollowUserView, FollowSuggestionListView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
+    path('profile/', ProfileView.as_view(), name='my-profile'),
+    path('profile/<int:user_id>/', ProfileView.as_view(), name='user-profile'),
     path('follow/<int:user_id>/', FollowUserView.as_view(), name='follow-user'),
+    path('follow/bulk/', BulkFollowView.as_view(), name='bulk-follow'),
     path('unfollow/<int:user_id>/', UnfollowUserView.as_view(), name='unfollow-user'),
+    path('suggestions/', FollowSuggestionListView.as_view(), name='follow-suggestions'),
 ]
@@ -4,8 +4,9 @@ from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
-from .serializers import RegisterSerializer, LoginSerializer
-from .models import CustomUser
+from .follows import follow_many
+from .serializers import RegisterSerializer, LoginSerializer, BulkFollowSerializer, ProfileSerializer, FollowSuggestionSerializer
+from .models import CustomUser, FollowSuggestion
 from django.contrib.auth import get_user_model
 
 
@@ -32,12 +33,41 @@ class LoginView(APIView):
 
 
 
+class LogoutView(APIView):
+    """Delete the token used for this request, signing the client out."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if isinstance(request.auth, Token):
+            Token.objects.filter(key=request.auth.key).delete()
+        return Response({"detail": "Logged out"}, status=status.HTTP_200_OK)
+
+
+class ProfileView(generics.RetrieveAPIView):
+    """
+    A user's profile, or the current user's when no ``user_id`` is given.
+
+    Follower and following totals are the denormalized counters on the
+    user row, so no follow rows are counted, and ``is_following`` comes from
+    the viewer's list in ``accounts.graph``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ProfileSerializer
+    queryset = CustomUser.objects.all()
+
+    def get_object(self):
+        # request.user may come from the token cache, so always read the
+        # row for fresh counters.
+        user_id = self.kwargs.get('user_id', self.request.user.pk)
+        return get_object_or_404(self.get_queryset(), pk=user_id)
+
+
 class FollowUserView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     queryset = CustomUser.objects.all()
 
-    def post(self, request, username):
-        user_to_follow = get_object_or_404(CustomUser, username=username)
+    def post(self, request, user_id):
+        user_to_follow = get_object_or_404(CustomUser, pk=user_id)
 
         if user_to_follow == request.user:
             return Response(
@@ -47,7 +77,39 @@ class FollowUserView(generics.GenericAPIView):
 
         request.user.following.add(user_to_follow)
         return Response(
-            {"detail": f"You are now following {username}"},
+            {"detail": f"You are now following {user_to_follow.username}"},
+            status=status.HTTP_200_OK
+        )
+
+
+class BulkFollowView(generics.GenericAPIView):
+    """
+    Follow many users by username in one request (e.g. a contacts import).
+
+    Usernames are resolved with one query and the new follows are written
+    with one insert. Unknown usernames are reported rather than failing the
+    whole request.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BulkFollowSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        usernames = set(serializer.validated_data['usernames'])
+
+        found = dict(
+            CustomUser.objects
+            .filter(username__in=usernames)
+            .values_list('id', 'username')
+        )
+        followed = follow_many(request.user, found)
+        return Response(
+            {
+                "followed": sorted(found[user_id] for user_id in followed),
+                "skipped": sorted(found[user_id] for user_id in set(found) - followed),
+                "not_found": sorted(usernames - set(found.values())),
+            },
             status=status.HTTP_200_OK
         )
 
@@ -56,11 +118,36 @@ class UnfollowUserView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     queryset = CustomUser.objects.all()
 
-    def post(self, request, username):
-        user_to_unfollow = get_object_or_404(CustomUser, username=username)
+    def post(self, request, user_id):
+        user_to_unfollow = get_object_or_404(CustomUser, pk=user_id)
 
         request.user.following.remove(user_to_unfollow)
         return Response(
-            {"detail": f"You have unfollowed {username}"},
+            {"detail": f"You have unfollowed {user_to_unfollow.username}"},
             status=status.HTTP_200_OK
         )
+
+
+class FollowSuggestionListView(generics.ListAPIView):
+    """
+    Precomputed "people you may know" for the current user, best first.
+
+    Rows come from ``compute_follow_suggestions``; users followed since the
+    last run are filtered out in the same query.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = FollowSuggestionSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        user = self.request.user
+        followed = CustomUser.followers.through.objects.filter(
+            to_customuser_id=user.pk
+        ).values('from_customuser_id')
+        return (
+            FollowSuggestion.objects
+            .filter(user=user)
+            .exclude(suggested_id__in=followed)
+            .select_related('suggested')
+            .order_by('-score', 'suggested_id')
+        )
@@ -0,0 +1,218 @@
+"""
+Queued notification dispatch.
+
+Request handlers call ``enqueue`` to record a lightweight
+``NotificationEvent`` row instead of building the notification themselves.
+The ``dispatch_notifications`` worker drains the queue in batches: duplicate
+events in a batch (a double-tapped like, for example) are collapsed and the
+rest become ``Notification`` rows through a single ``bulk_create``, or are
+folded into recent ones ("alice and 41 others liked your post").
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import unread
+from .models import Notification, NotificationActor, NotificationEvent
+from .pubsub import get_broker
+
+User = get_user_model()
+
+
+def _event(recipient_id, actor_id, verb, target=None):
+    event = NotificationEvent(recipient_id=recipient_id, actor_id=actor_id, verb=verb)
+    if target is not None:
+        event.target_content_type = ContentType.objects.get_for_model(target)
+        event.target_object_id = target.pk
+    return event
+
+
+def enqueue(recipient_id, actor_id, verb, target=None):
+    """Queue one notification; self-notifications are dropped."""
+    if recipient_id != actor_id:
+        _event(recipient_id, actor_id, verb, target).save()
+
+
+def enqueue_many(events):
+    """
+    Queue several notifications with one insert.
+
+    ``events`` is an iterable of ``(recipient_id, actor_id, verb, target)``
+    tuples.
+    """
+    NotificationEvent.objects.bulk_create(
+        _event(*event) for event in events if event[0] != event[1]
+    )
+
+
+def _coalesce_window():
+    seconds = getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', None)
+    return timedelta(seconds=seconds) if seconds else None
+
+
+def _group_events(events, coalesce):
+    """
+    Group events by notification key, collecting distinct actors newest first.
+
+    When coalescing, the actor is not part of the key, so every actor that
+    acted on the same target for the same recipient shares one group.
+    """
+    groups = {}
+    for event in events:
+        key = (
+            event.recipient_id,
+            event.verb,
+            event.target_content_type_id,
+            event.target_object_id,
+        )
+        if not coalesce:
+            key += (event.actor_id,)
+        actors = groups.setdefault(key, [])
+        if event.actor_id in actors:
+            actors.remove(event.actor_id)
+        actors.insert(0, event.actor_id)
+    return groups
+
+
+def _open_notifications(keys, window):
+    """
+    Unread notifications inside the window that new events can fold into.
+
+    They are locked until the caller's transaction ends, so two workers
+    folding into the same notification take turns instead of overwriting
+    each other's count, sample and actor rows.
+    """
+    condition = Q()
+    for recipient_id, verb, content_type_id, object_id in keys:
+        condition |= Q(
+            recipient_id=recipient_id,
+            verb=verb,
+            target_content_type_id=content_type_id,
+            target_object_id=object_id,
+        )
+    candidates = (
+        Notification.objects
+        .filter(condition, is_read=False, timestamp__gte=timezone.now() - window)
+        .order_by('timestamp', 'pk')
+        .select_for_update()
+    )
+    # Later rows overwrite earlier ones, leaving the newest per key.
+    return {
+        (n.recipient_id, n.verb, n.target_content_type_id, n.target_object_id): n
+        for n in candidates
+    }
+
+
+def _snapshot_target_reprs(notifications):
+    """Fill ``target_repr`` with one query per target content type."""
+    ids_by_type = {}
+    for notification in notifications:
+        if notification.target_content_type_id is not None:
+            ids_by_type.setdefault(notification.target_content_type_id, set()).add(
+                notification.target_object_id
+            )
+
+    reprs = {}
+    for content_type_id, object_ids in ids_by_type.items():
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        for target in content_type.get_all_objects_for_this_type(pk__in=object_ids):
+            reprs[content_type_id, target.pk] = str(target)[:255]
+
+    for notification in notifications:
+        key = (notification.target_content_type_id, notification.target_object_id)
+        notification.target_repr = reprs.get(key, '')
+
+
+def drain(batch_size=500):
+    """
+    Turn up to ``batch_size`` queued events into notifications.
+
+    Returns the number of events consumed. Where the database supports it,
+    claimed rows are locked with ``SKIP LOCKED`` so several workers can
+    drain the queue side by side.
+
+    With ``NOTIFICATION_COALESCE_WINDOW`` set, events for the same
+    recipient, verb and target are folded into a single notification (a new
+    one, or an unread one from inside the window) carrying an actor count
+    and a sample of the most recent actors' usernames.
+    """
+    window = _coalesce_window()
+    sample_size = getattr(settings, 'NOTIFICATION_ACTOR_SAMPLE_SIZE', 3)
+
+    with transaction.atomic():
+        pending = NotificationEvent.objects.order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        events = list(pending[:batch_size])
+        if not events:
+            return 0
+
+        groups = _group_events(events, coalesce=window is not None)
+        actors_by_id = User.objects.only('username').in_bulk({event.actor_id for event in events})
+        existing = _open_notifications(groups, window) if window else {}
+
+        created, updated = [], []
+        # Actor ids behind each notification in this batch, for NotificationActor rows.
+        batch_actors = []
+        for key, actors in groups.items():
+            names = [actors_by_id[actor_id].username for actor_id in actors]
+            notification = existing.get(key)
+            if notification is None:
+                recipient_id, verb, content_type_id, object_id = key[:4]
+                notification = Notification(
+                    recipient_id=recipient_id,
+                    actor=actors_by_id[actors[0]],
+                    verb=verb,
+                    target_content_type_id=content_type_id,
+                    target_object_id=object_id,
+                    actor_count=len(actors),
+                    actor_sample=names[:sample_size],
+                )
+                created.append(notification)
+                batch_actors.append((notification, actors, False))
+                continue
+
+            notification.actor = actors_by_id[actors[0]]
+            notification.actor_sample = (
+                names + [name for name in notification.actor_sample if name not in names]
+            )[:sample_size]
+            notification.timestamp = timezone.now()
+            updated.append(notification)
+            batch_actors.append((notification, actors, True))
+
+        # Returning actors are recognised by their NotificationActor rows; the
+        # sample is truncated, so it cannot tell them from new ones.
+        known = set(
+            NotificationActor.objects
+            .filter(notification__in=updated)
+            .values_list('notification_id', 'actor_id')
+        )
+
+        if getattr(settings, 'NOTIFICATION_SNAPSHOT_TARGET_REPR', True):
+            _snapshot_target_reprs(created)
+        Notification.objects.bulk_create(created)
+
+        links = []
+        for notification, actors, folded in batch_actors:
+            new_actors = [actor_id for actor_id in actors if (notification.pk, actor_id) not in known]
+            if folded:
+                notification.actor_count += len(new_actors)
+            links.extend(NotificationActor(notification=notification, actor_id=actor_id) for actor_id in new_actors)
+        # Folded notifications are locked, so no other worker links the same
+        # actors meanwhile; a stray duplicate must still not fail the batch.
+        NotificationActor.objects.bulk_create(links, ignore_conflicts=True)
+        # bulk_create sends no post_save, so bump the badge counters here.
+        new_unread = Counter(notification.recipient_id for notification in created)
+        transaction.on_commit(lambda: unread.incr_many(new_unread))
+        transaction.on_commit(lambda: get_broker().notify(created + updated))
+        Notification.objects.bulk_update(
+            updated, ['actor', 'actor_count', 'actor_sample', 'timestamp']
+        )
+        NotificationEvent.objects.filter(id__in=[event.id for event in events]).delete()
+    return len(events)
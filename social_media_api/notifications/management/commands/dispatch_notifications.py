@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.dispatch import drain
+
+
+class Command(BaseCommand):
+    help = "Drain the notification queue into Notification rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of queued events processed per batch.",
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help="Keep running, polling the queue when it is empty.",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls of an empty queue with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        dispatched = 0
+
+        while True:
+            processed = drain(options['batch_size'])
+            dispatched += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Dispatched {dispatched} notification events."))
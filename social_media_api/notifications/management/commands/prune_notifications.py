@@ -0,0 +1,94 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from notifications.models import Notification, NotificationActor
+
+ARCHIVE_FIELDS = [
+    'id', 'recipient_id', 'actor_id', 'verb', 'target_content_type_id',
+    'target_object_id', 'target_repr', 'timestamp', 'actor_count', 'actor_sample',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications older than the retention period, in small "
+        "primary-key batches so no single statement holds a long write lock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90),
+            help="Delete read notifications older than this many days.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of notifications deleted per statement.",
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.1,
+            help="Seconds to pause between batches.",
+        )
+        parser.add_argument(
+            '--archive',
+            metavar='PATH',
+            help="Append deleted notifications to this file as JSON lines first.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = Notification.objects.filter(is_read=True, timestamp__lt=cutoff).order_by('id')
+        archive = open(options['archive'], 'a') if options['archive'] else None
+        last_id = 0
+        deleted = 0
+
+        try:
+            while True:
+                ids = list(expired.filter(id__gt=last_id).values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+
+                if archive:
+                    for row in Notification.objects.filter(id__in=ids).order_by('id').values(*ARCHIVE_FIELDS):
+                        archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                    archive.flush()
+
+                # Each batch commits on its own, keeping lock time short.
+                deleted += Notification.objects.filter(id__in=ids).delete()[0]
+                NotificationActor.objects.filter(notification_id__in=ids).delete()
+                last_id = ids[-1]
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+        finally:
+            if archive:
+                archive.close()
+
+        # Actor rows of notifications deleted elsewhere (bulk delete, user
+        # deletion), which do not cascade.
+        orphaned = (
+            NotificationActor.objects
+            .filter(~Exists(Notification.objects.filter(pk=OuterRef('notification_id'))))
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        while True:
+            ids = list(orphaned[:options['batch_size']])
+            if not ids:
+                break
+            NotificationActor.objects.filter(id__in=ids).delete()
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} notifications older than {options['days']} days."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='target_repr',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_actors(apps, schema_editor):
+    # Only the latest actor and the sampled usernames are still known for
+    # existing notifications; their actor_count is left as it is.
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationActor = apps.get_model('notifications', 'NotificationActor')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    rows = Notification.objects.values_list('id', 'actor_id', 'actor_sample').iterator(chunk_size=1000)
+    batch = []
+    for notification_id, actor_id, sample in rows:
+        actor_ids = {actor_id}
+        if sample:
+            actor_ids.update(User.objects.filter(username__in=sample).values_list('id', flat=True))
+        batch.extend(NotificationActor(notification_id=notification_id, actor_id=pk) for pk in actor_ids)
+        if len(batch) >= 1000:
+            NotificationActor.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    NotificationActor.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_notification_retention_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('notification', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='actor_links', to='notifications.notification')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('notification', 'actor'), name='notification_actor_unique')],
+            },
+        ),
+        migrations.RunPython(populate_actors, migrations.RunPython.noop),
+    ]
@@ -31,12 +31,99 @@ class Notification(models.Model):
         'target_content_type',
         'target_object_id'
     )
+    # Snapshot of str(target) taken at dispatch time, so listing old
+    # notifications never has to resolve the generic relation.
+    target_repr = models.CharField(max_length=255, blank=True)
 
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    # Coalesced notifications: how many actors are folded into this row and
+    # the usernames of the most recent few (``actor`` is the latest one).
+    actor_count = models.PositiveIntegerField(default=1)
+    actor_sample = models.JSONField(default=list, blank=True)
+
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['recipient', '-timestamp'], name='notification_recipient_ts_idx'),
+            # Lets the retention job find expired read notifications.
+            models.Index(
+                fields=['timestamp'],
+                condition=models.Q(is_read=True),
+                name='notification_read_ts_idx',
+            ),
+            # Serves unread counts without touching read notifications.
+            models.Index(
+                fields=['recipient'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.actor} {self.verb} → {self.recipient}"
+
+
+class NotificationActor(models.Model):
+    """
+    One distinct actor folded into a notification.
+
+    ``Notification.actor_count`` is the number of these rows; ``actor_sample``
+    only keeps the most recent few, so it cannot tell a returning actor from
+    a new one.
+    """
+    # No cascade, so deleting notifications stays a single DELETE statement;
+    # prune_notifications removes the rows left behind.
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='actor_links'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'actor'], name='notification_actor_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_id} in notification {self.notification_id}"
+
+
+class NotificationEvent(models.Model):
+    """
+    A pending notification waiting in the dispatch queue.
+
+    Views enqueue these with ``notifications.dispatch.enqueue`` and the
+    ``dispatch_notifications`` worker turns them into ``Notification`` rows
+    in batches.
+    """
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    verb = models.CharField(max_length=255)
+    target_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    target_object_id = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.actor_id} {self.verb} → {self.recipient_id} (pending)"
@@ -0,0 +1,197 @@
+"""
+Pub/sub for live notification delivery.
+
+SSE connections ``subscribe`` to their user's channel and await messages on
+an asyncio queue. Writers call ``notify`` after new notifications commit.
+The backend is chosen with ``NOTIFICATIONS_PUBSUB_BACKEND``:
+
+* ``InProcessBroker`` delivers what ``notify`` is given directly. It only
+  reaches connections served by the process that created the
+  notifications.
+* ``DatabaseTailBroker`` ignores ``notify``; one background thread per
+  process tails the notifications table for subscribed users instead, so
+  notifications written by the separate dispatch worker still arrive. That
+  is one query per interval for the whole process rather than one poll per
+  client. It tails ``timestamp``, which folding a new actor into a
+  notification also moves, so updated notifications are pushed again.
+
+Other backends (Redis pub/sub, for instance) only need to provide
+``subscribe`` and ``notify``.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One connection's view of a channel, backed by a bounded asyncio queue."""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        # Called from any thread; hand the message to the subscriber's loop.
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if self.queue.full():
+            # A slow client loses its oldest messages rather than growing
+            # the queue without bound.
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channel):
+        """Subscribe the running event loop to ``channel`` (a user id)."""
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.channel]
+
+    def channels(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def notify(self, notifications):
+        """Publish committed notifications to their recipients' channels."""
+        for notification in notifications:
+            if notification.recipient_id in self._subscriptions:
+                self.publish(notification.recipient_id, NotificationSerializer(notification).data)
+
+
+class DatabaseTailBroker(InProcessBroker):
+    """
+    Tails notifications by ``timestamp`` for subscribed users.
+
+    Timestamps are taken before the writing transaction commits, so a row
+    can become visible with a timestamp behind rows already published.
+    Each poll therefore re-reads ``NOTIFICATIONS_PUBSUB_LOOKBACK`` seconds
+    before the watermark and skips ``(id, timestamp)`` pairs it already
+    published; rows committing within that lag are not missed.
+    """
+    batch_size = 500
+
+    def __init__(self):
+        super().__init__()
+        self.interval = getattr(settings, 'NOTIFICATIONS_PUBSUB_POLL_INTERVAL', 1.0)
+        self.lookback = timedelta(seconds=getattr(settings, 'NOTIFICATIONS_PUBSUB_LOOKBACK', 5))
+        self._thread = None
+        self._since = None
+        # (id, timestamp) -> timestamp of rows published inside the lookback.
+        self._published = {}
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._tail, name='notification-tail', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def notify(self, notifications):
+        # Rows are picked up by the tail thread.
+        pass
+
+    def poll(self):
+        """Publish notifications created or updated since the last poll; returns how many."""
+        if self._since is None:
+            self._since = timezone.now()
+        channels = self.channels()
+        if not channels:
+            return 0
+
+        recent = (
+            Notification.objects
+            .filter(timestamp__gte=self._since - self.lookback, recipient_id__in=channels)
+            .values_list('id', 'timestamp')
+        )
+        fresh = []
+        for row in recent:
+            if row not in self._published:
+                fresh.append(row[0])
+            self._since = max(self._since, row[1])
+
+        published = 0
+        for start in range(0, len(fresh), self.batch_size):
+            rows = list(
+                Notification.objects
+                .filter(id__in=fresh[start:start + self.batch_size])
+                .select_related('actor')
+                .order_by('timestamp', 'id')
+            )
+            for notification in rows:
+                self._published[notification.id, notification.timestamp] = notification.timestamp
+            super().notify(rows)
+            published += len(rows)
+
+        horizon = self._since - self.lookback
+        self._published = {key: at for key, at in self._published.items() if at >= horizon}
+        return published
+
+    def _tail(self):
+        while True:
+            close_old_connections()
+            try:
+                self.poll()
+            except Exception:
+                # Keep tailing through transient database errors.
+                logger.exception("Notification tail poll failed")
+            time.sleep(self.interval)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            backend = getattr(
+                settings, 'NOTIFICATIONS_PUBSUB_BACKEND', 'notifications.pubsub.InProcessBroker'
+            )
+            _broker = import_string(backend)()
+        return _broker
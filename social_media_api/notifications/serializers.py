@@ -1,13 +1,70 @@
 from rest_framework import serializers
+
+from posts.serializers import DynamicFieldsMixin
+
 from .models import Notification
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     actor_username = serializers.CharField(source='actor.username', read_only=True)
     target_repr = serializers.SerializerMethodField()
+    summary = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
-        fields = ['id', 'actor_username', 'verb', 'target_repr', 'read', 'timestamp']
+        fields = [
+            'id', 'actor_username', 'verb', 'target_repr', 'is_read', 'timestamp',
+            'actor_count', 'actor_sample', 'summary',
+        ]
+
+    field_sources = {
+        'target_repr': ('target_repr', 'target_content_type', 'target_object_id'),
+        'summary': ('actor_sample', 'actor', 'actor_count', 'verb'),
+    }
 
     def get_target_repr(self, obj):
+        if obj.target_repr:
+            return obj.target_repr
+        # Older rows without a snapshot; NotificationListView batch-loads
+        # their targets so this does not query per row.
         return str(obj.target) if obj.target else None
+
+    def get_summary(self, obj):
+        # "alice liked your post" / "alice and 41 others liked your post"
+        actor = obj.actor_sample[0] if obj.actor_sample else obj.actor.username
+        others = obj.actor_count - 1
+        if others > 0:
+            noun = 'other' if others == 1 else 'others'
+            return f"{actor} and {others} {noun} {obj.verb}"
+        return f"{actor} {obj.verb}"
+
+
+class NotificationBulkSerializer(serializers.Serializer):
+    """
+    Selects the notifications a bulk action applies to.
+
+    Exactly one of ``ids``, ``up_to_id`` (inclusive id watermark) or
+    ``before`` (timestamp watermark) must be given.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    up_to_id = serializers.IntegerField(required=False, min_value=1)
+    before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if len(data) != 1:
+            raise serializers.ValidationError(
+                "Provide exactly one of 'ids', 'up_to_id' or 'before'."
+            )
+        return data
+
+    def filter(self, queryset):
+        data = self.validated_data
+        if 'ids' in data:
+            return queryset.filter(id__in=data['ids'])
+        if 'up_to_id' in data:
+            return queryset.filter(id__lte=data['up_to_id'])
+        return queryset.filter(timestamp__lt=data['before'])
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from accounts.signals import users_followed
+
+from . import unread
+from .dispatch import enqueue_many
+from .models import Notification
+from .pubsub import get_broker
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        transaction.on_commit(lambda: unread.incr(instance.recipient_id))
+
+
+@receiver(post_save, sender=Notification)
+def publish_new_notification(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: get_broker().notify([instance]))
+
+
+@receiver(users_followed)
+def queue_follow_notifications(sender, edges, **kwargs):
+    # One insert however many users were followed at once.
+    enqueue_many(
+        (followee_id, follower_id, 'started following you', None)
+        for follower_id, followee_id in edges
+    )
@@ -1,3 +1,324 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from posts.models import Comment, Post
+
+from . import unread
+from .dispatch import drain, enqueue, enqueue_many
+from .pubsub import DatabaseTailBroker, InProcessBroker
+from .models import Notification, NotificationActor, NotificationEvent
+
+User = get_user_model()
+
+
+class DispatchTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass123')
+        self.bob = User.objects.create_user(username='bob', password='pass123')
+        self.post = Post.objects.create(author=self.alice, title='Post', content='...')
+
+    def test_enqueue_defers_notification_until_drained(self):
+        enqueue(self.alice.pk, self.bob.pk, 'liked your post', self.post)
+        self.assertFalse(Notification.objects.exists())
+
+        self.assertEqual(drain(), 1)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.target, self.post)
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_duplicate_events_in_a_batch_are_collapsed(self):
+        enqueue_many([
+            (self.alice.pk, self.bob.pk, 'liked your post', self.post),
+            (self.alice.pk, self.bob.pk, 'liked your post', self.post),
+            (self.bob.pk, self.alice.pk, 'started following you', None),
+            (self.alice.pk, self.alice.pk, 'liked your post', self.post),
+        ])
+        call_command('dispatch_notifications', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(NotificationEvent.objects.exists())
+
+
+class CoalescingTests(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.post = Post.objects.create(author=self.author, title='Post', content='...')
+        self.fans = [User.objects.create_user(username=f'fan{i}', password='pass123') for i in range(4)]
+
+    def like(self, *fans):
+        enqueue_many((self.author.pk, fan.pk, 'liked your post', self.post) for fan in fans)
+        drain()
+
+    def test_likes_on_one_post_fold_into_one_notification(self):
+        self.like(*self.fans[:2])
+        self.like(*self.fans[2:])
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 4)
+        self.assertEqual(notification.actor_sample, ['fan3', 'fan2', 'fan1'])
+
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get(reverse('notifications'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['summary'], 'fan3 and 3 others liked your post')
+
+    def test_returning_actors_are_counted_once(self):
+        self.fans += [User.objects.create_user(username=f'fan{i}', password='pass123') for i in range(4, 6)]
+        self.like(*self.fans)
+        # fan0 has dropped out of the three-name sample, then likes again.
+        self.like(self.fans[0])
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 6)
+        self.assertEqual(notification.actor_sample, ['fan0', 'fan5', 'fan4'])
+
+    def test_read_notifications_are_not_reopened(self):
+        self.like(self.fans[0])
+        Notification.objects.update(is_read=True)
+        self.like(self.fans[1])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    @override_settings(NOTIFICATION_COALESCE_WINDOW=None)
+    def test_coalescing_can_be_disabled(self):
+        self.like(*self.fans)
+        self.assertEqual(Notification.objects.count(), 4)
+
+
+class NotificationListQueryTests(APITestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='pass123')
+        self.client.force_authenticate(user=self.recipient)
+
+    def add_notifications(self, count):
+        for i in range(count):
+            actor = User.objects.create_user(username=f'actor{Notification.objects.count()}', password='pass123')
+            post = Post.objects.create(author=self.recipient, title=f'Post {i}', content='...')
+            comment = Comment.objects.create(author=actor, post=post, content='...')
+            for target in (post, comment):
+                Notification.objects.create(
+                    recipient=self.recipient, actor=actor, verb='acted on', target=target
+                )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('notifications'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_targets_are_resolved_per_content_type(self):
+        self.add_notifications(1)
+        small = self.count_queries()
+        self.add_notifications(4)
+        self.assertEqual(self.count_queries(), small)
+
+    def test_snapshot_skips_target_lookup(self):
+        post = Post.objects.create(author=self.recipient, title='Snapshot', content='...')
+        enqueue(self.recipient.pk, User.objects.create_user(username='fan', password='pass123').pk, 'liked your post', post)
+        drain()
+        Post.objects.filter(pk=post.pk).update(title='Renamed')
+
+        response = self.client.get(reverse('notifications'))
+        self.assertEqual(response.data['results'][0]['target_repr'], 'Snapshot')
+
+
+class UnreadCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.recipient = User.objects.create_user(username='recipient', password='pass123')
+        self.actor = User.objects.create_user(username='actor', password='pass123')
+        self.client.force_authenticate(user=self.recipient)
+
+    def unread(self):
+        response = self.client.get(reverse('notifications-unread-count'))
+        self.assertEqual(response.status_code, 200)
+        return response.data['unread_count']
+
+    def test_counter_follows_creates_and_is_served_from_cache(self):
+        self.assertEqual(self.unread(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(recipient=self.recipient, actor=self.actor, verb='waved')
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(self.recipient.pk, self.actor.pk, 'followed you')
+            drain()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.unread(), 2)
+        self.assertFalse(any('notifications_notification' in q['sql'] for q in queries.captured_queries))
+
+    def test_invalidate_forces_recount(self):
+        self.assertEqual(self.unread(), 0)
+        Notification.objects.bulk_create([
+            Notification(recipient=self.recipient, actor=self.actor, verb='waved'),
+        ])
+        unread.invalidate(self.recipient.pk)
+        self.assertEqual(self.unread(), 1)
+
+
+class BulkActionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.recipient = User.objects.create_user(username='recipient', password='pass123')
+        self.actor = User.objects.create_user(username='actor', password='pass123')
+        self.notifications = Notification.objects.bulk_create([
+            Notification(recipient=self.recipient, actor=self.actor, verb=f'waved {i}')
+            for i in range(5)
+        ])
+        Notification.objects.create(recipient=self.actor, actor=self.recipient, verb='waved')
+        self.client.force_authenticate(user=self.recipient)
+
+    def test_mark_read_up_to_watermark_is_one_update(self):
+        watermark = self.notifications[2].id
+        self.assertEqual(self.client.get(reverse('notifications-unread-count')).data['unread_count'], 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('notifications-mark-read'), {'up_to_id': watermark}, format='json')
+        self.assertEqual(response.data, {'marked_read': 3})
+        self.assertEqual(sum(q['sql'].startswith('UPDATE') for q in queries.captured_queries), 1)
+        self.assertEqual(self.client.get(reverse('notifications-unread-count')).data['unread_count'], 2)
+
+    def test_delete_by_ids_only_touches_own_notifications(self):
+        other = Notification.objects.get(recipient=self.actor)
+        ids = [self.notifications[0].id, other.id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('notifications-delete'), {'ids': ids}, format='json')
+
+        self.assertEqual(response.data, {'deleted': 1})
+        statements = [q['sql'] for q in queries.captured_queries if 'notifications_notification' in q['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('DELETE'))
+        self.assertTrue(Notification.objects.filter(id=other.id).exists())
+
+    def test_exactly_one_selector_is_required(self):
+        response = self.client.post(
+            reverse('notifications-mark-read'), {'ids': [1], 'up_to_id': 3}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='pass123')
+        self.actor = User.objects.create_user(username='actor', password='pass123')
+
+    def make(self, count, is_read, days_old):
+        notifications = Notification.objects.bulk_create([
+            Notification(recipient=self.recipient, actor=self.actor, verb='waved', is_read=is_read)
+            for _ in range(count)
+        ])
+        NotificationActor.objects.bulk_create(
+            NotificationActor(notification=notification, actor=self.actor) for notification in notifications
+        )
+        Notification.objects.filter(timestamp__gte=timezone.now() - timedelta(minutes=1)).update(
+            timestamp=timezone.now() - timedelta(days=days_old)
+        )
+
+    def test_prunes_only_old_read_notifications_and_archives_them(self):
+        self.make(5, is_read=True, days_old=100)
+        self.make(2, is_read=False, days_old=100)
+        self.make(3, is_read=True, days_old=0)
+
+        with tempfile.NamedTemporaryFile('r', suffix='.jsonl') as archive:
+            call_command(
+                'prune_notifications', days=30, batch_size=2, sleep=0,
+                archive=archive.name, stdout=StringIO(),
+            )
+            archived = [json.loads(line) for line in archive]
+
+        self.assertEqual(len(archived), 5)
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(
+            set(NotificationActor.objects.values_list('notification_id', flat=True)),
+            set(Notification.objects.values_list('id', flat=True)),
+        )
+        self.assertFalse(Notification.objects.filter(is_read=True, timestamp__lt=timezone.now() - timedelta(days=30)).exists())
+
+
+class StreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='listener', password='pass123')
+        cls.actor = User.objects.create_user(username='actor', password='pass123')
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('notifications-stream'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_wsgi_requests_are_refused(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('notifications-stream'))
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('ASGI', response.json()['detail'])
+
+    async def test_new_notifications_are_pushed(self):
+        broker = InProcessBroker()
+        await self.async_client.aforce_login(self.user)
+        with patch('notifications.views.get_broker', return_value=broker):
+            response = await self.async_client.get(reverse('notifications-stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        notification = Notification(id=41, recipient=self.user, actor=self.actor, verb='waved', actor_sample=['actor'])
+        broker.notify([notification])
+        event = (await anext(stream)).decode()
+        self.assertTrue(event.startswith('id: 41\nevent: notification\n'))
+        self.assertIn('"summary":"actor waved"', event)
+        await stream.aclose()
+
+
+class DatabaseTailBrokerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', password='pass123')
+        self.actor = User.objects.create_user(username='actor', password='pass123')
+        self.broker = DatabaseTailBroker()
+
+    def poll(self):
+        """Poll as if ``user`` were subscribed; returns the published notification ids."""
+        with patch.dict(self.broker._subscriptions, {self.user.pk: set()}), \
+                patch.object(self.broker, 'publish') as publish:
+            self.broker.poll()
+        return [message['id'] for _, message in (call.args for call in publish.call_args_list)]
+
+    def notify(self, **fields):
+        notification = Notification.objects.create(recipient=self.user, actor=self.actor, verb='waved')
+        if fields:
+            Notification.objects.filter(pk=notification.pk).update(**fields)
+        return notification
+
+    def test_publishes_new_folded_and_late_rows_once(self):
+        placeholder = self.notify()
+        self.poll()
+        placeholder.delete()
+
+        first = self.notify()
+        self.assertEqual(self.poll(), [first.id])
+        self.assertEqual(self.poll(), [])
+
+        # drain() folding another actor in moves the timestamp, not the id.
+        Notification.objects.filter(pk=first.pk).update(
+            actor_count=2, timestamp=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(self.poll(), [first.id])
+
+        # A row with a lower id and an earlier timestamp that commits late.
+        late = Notification.objects.create(
+            id=placeholder.id, recipient=self.user, actor=self.actor, verb='poked'
+        )
+        Notification.objects.filter(pk=late.pk).update(timestamp=timezone.now() - timedelta(seconds=2))
+        self.assertEqual(self.poll(), [late.id])
+        self.assertEqual(self.poll(), [])
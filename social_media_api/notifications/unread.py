@@ -0,0 +1,47 @@
+"""
+Per-user unread notification counters kept in the cache.
+
+Badge polling reads the cached number. On a miss it falls back to a
+``COUNT(*)`` served by the partial ``(recipient) WHERE NOT is_read`` index.
+Writers keep the cached value current with ``incr`` when notifications
+are created or marked read. After set-based deletes they call
+``invalidate`` so the next read recounts. The TTL bounds any drift from lost races.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Notification
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    key = _key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.set(key, count, getattr(settings, 'NOTIFICATION_UNREAD_CACHE_TTL', 300))
+    return count
+
+
+def incr(user_id, delta=1):
+    """Adjust a cached counter; uncached counters are left for the next read."""
+    try:
+        if delta >= 0:
+            cache.incr(_key(user_id), delta)
+        else:
+            cache.decr(_key(user_id), -delta)
+    except ValueError:
+        pass
+
+
+def incr_many(deltas):
+    """Apply ``incr`` for every ``{user_id: delta}`` pair."""
+    for user_id, delta in deltas.items():
+        incr(user_id, delta)
+
+
+def invalidate(*user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import NotificationListView  # replace with your actual view
+from .views import BulkDeleteView, MarkReadView, NotificationListView, UnreadCountView, notification_stream
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notifications'),
+    path('unread-count/', UnreadCountView.as_view(), name='notifications-unread-count'),
+    path('mark-read/', MarkReadView.as_view(), name='notifications-mark-read'),
+    path('delete/', BulkDeleteView.as_view(), name='notifications-delete'),
+    path('stream/', notification_stream, name='notifications-stream'),
 ]
@@ -1,11 +1,160 @@
-from rest_framework import generics, permissions
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db.models import prefetch_related_objects
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from posts.mixins import RelatedQuerysetMixin, SparseFieldsetMixin
+from posts.models import Comment
+from social_media_api.renderers import dumps
+
+from . import unread
 from .models import Notification
-from .serializers import NotificationSerializer
+from .pubsub import get_broker
+from .serializers import NotificationBulkSerializer, NotificationSerializer
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(SparseFieldsetMixin, RelatedQuerysetMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('actor',)
+    # Querysets used to load targets whose __str__ follows a relation.
+    target_querysets = [Comment.objects.select_related('author')]
 
     def get_queryset(self):
         # Only return notifications for the logged-in user
         return Notification.objects.filter(recipient=self.request.user).order_by('-timestamp')
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and 'target_repr' in self.get_serializer().fields:
+            # Resolve targets only for rows without a snapshot, with one
+            # query per content type instead of one per notification.
+            prefetch_related_objects(
+                [n for n in page if not n.target_repr and n.target_object_id],
+                GenericPrefetch('target', self.target_querysets),
+            )
+        return page
+
+
+class UnreadCountView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread_count': unread.unread_count(request.user.pk)})
+
+
+class BulkNotificationView(APIView):
+    """
+    Base for bulk actions; each request runs one set-based statement over
+    the notifications selected by ``NotificationBulkSerializer``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = NotificationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = serializer.filter(Notification.objects.filter(recipient=request.user))
+        return Response(self.perform_bulk_action(queryset), status=status.HTTP_200_OK)
+
+
+class MarkReadView(BulkNotificationView):
+    def perform_bulk_action(self, queryset):
+        updated = queryset.filter(is_read=False).update(is_read=True)
+        unread.incr(self.request.user.pk, -updated)
+        return {'marked_read': updated}
+
+
+class BulkDeleteView(BulkNotificationView):
+    def perform_bulk_action(self, queryset):
+        # Notification has no delete signals or cascading rows (actor links
+        # are swept by prune_notifications), so this is a single DELETE
+        # statement rather than a fetch-then-delete.
+        deleted, _ = queryset.delete()
+        unread.invalidate(self.request.user.pk)
+        return {'deleted': deleted}
+
+
+def _authenticate(request):
+    # Reuse the API's authentication classes (token, session, ...).
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    user = Request(request, authenticators=authenticators).user
+    return user if user.is_authenticated else None
+
+
+def _missed_notifications(user, last_event_id):
+    """Notifications created after the client's last seen id, for replay."""
+    rows = (
+        Notification.objects
+        .filter(recipient=user, id__gt=last_event_id)
+        .select_related('actor')
+        .order_by('id')[:100]
+    )
+    return [NotificationSerializer(row).data for row in rows]
+
+
+def _event(message):
+    return f"id: {message['id']}\nevent: notification\ndata: {dumps(message).decode()}\n\n"
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events stream of the user's new notifications.
+
+    One long-lived connection replaces client polling. Messages come from
+    the configured pub/sub broker. A ``Last-Event-ID`` header (sent by
+    ``EventSource`` on reconnect) replays anything missed in between.
+
+    Needs an ASGI server: under WSGI (including ``runserver``) Django
+    consumes the whole iterator before sending anything, so the stream
+    would never respond. Such requests get a 501 instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'The notification stream requires an ASGI server (social_media_api.asgi:application).'},
+            status=501,
+        )
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except APIException:
+        user = None
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'}, status=401
+        )
+
+    subscription = get_broker().subscribe(user.pk)
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    missed = []
+    if last_event_id.isdigit():
+        missed = await sync_to_async(_missed_notifications)(user, int(last_event_id))
+    heartbeat = getattr(settings, 'NOTIFICATIONS_STREAM_HEARTBEAT', 15)
+
+    async def events():
+        try:
+            yield 'retry: 5000\n\n'
+            for message in missed:
+                yield _event(message)
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream.
+                    yield ': keep-alive\n\n'
+                else:
+                    yield _event(message)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,159 @@
+"""
+Prefix autocomplete for usernames and post titles.
+
+Each ``PrefixIndex`` keeps normalized keys in a sorted Python list next to a
+parallel list of ``(id, label)`` pairs, so a lookup is a ``bisect`` followed
+by a short forward scan, with no database access. Post titles are indexed
+from the start of every word, so "dja" finds "Learning Django". Keys are
+cut to ``AUTOCOMPLETE_MAX_KEY_LENGTH`` characters, which bounds memory per
+label; longer queries are checked against the label itself.
+
+An index is loaded from the database on first use and then kept current
+in this process by ``posts.signals``. Changes made by other processes show
+up when the index is reloaded, at most ``AUTOCOMPLETE_REFRESH_INTERVAL``
+seconds later.
+"""
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .models import Post
+
+User = get_user_model()
+
+_WORD_START = re.compile(r'\b\w', re.UNICODE)
+
+
+def normalize(text):
+    """Case- and accent-insensitive form of ``text`` used for keys and queries."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+class PrefixIndex:
+    def __init__(self, load, keys_for):
+        self._load_rows = load
+        self._keys_for = keys_for
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._loaded_at = None
+        self._max_key_length = None
+        self._keys = []
+        self._values = []
+        # id -> keys currently indexed for it, so renames and deletes can
+        # find the old entries.
+        self._by_id = {}
+
+    def _index_keys(self, label):
+        return sorted({key[:self._max_key_length] for key in self._keys_for(label)})
+
+    def _build(self):
+        entries = []
+        by_id = {}
+        for pk, label in self._load_rows():
+            keys = self._index_keys(label)
+            by_id[pk] = keys
+            entries.extend((key, pk, label) for key in keys)
+        entries.sort()
+        return [key for key, _, _ in entries], [(pk, label) for _, pk, label in entries], by_id
+
+    def _ensure_loaded(self):
+        interval = getattr(settings, 'AUTOCOMPLETE_REFRESH_INTERVAL', 300)
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < interval:
+            return
+        # A stale index keeps serving while another thread reloads it; only
+        # the very first load makes callers wait.
+        if not self._build_lock.acquire(blocking=loaded_at is None):
+            return
+        try:
+            if self._loaded_at is not loaded_at:
+                return
+            self._max_key_length = getattr(settings, 'AUTOCOMPLETE_MAX_KEY_LENGTH', 20)
+            keys, values, by_id = self._build()
+            with self._lock:
+                self._keys, self._values, self._by_id = keys, values, by_id
+                self._loaded_at = time.monotonic()
+        finally:
+            self._build_lock.release()
+
+    def search(self, prefix, limit):
+        """Up to ``limit`` ``(id, label)`` pairs whose key starts with ``prefix``."""
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        self._ensure_loaded()
+        results = []
+        seen = set()
+        with self._lock:
+            probe = prefix[:self._max_key_length]
+            position = bisect_left(self._keys, probe)
+            while position < len(self._keys) and self._keys[position].startswith(probe):
+                pk, label = self._values[position]
+                if pk not in seen and (
+                    probe == prefix or any(key.startswith(prefix) for key in self._keys_for(label))
+                ):
+                    seen.add(pk)
+                    results.append((pk, label))
+                    if len(results) == limit:
+                        break
+                position += 1
+        return results
+
+    def update(self, pk, label):
+        """Index ``label`` for ``pk``, replacing what was indexed before."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(pk)
+            keys = self._index_keys(label)
+            for key in keys:
+                position = bisect_left(self._keys, key)
+                self._keys.insert(position, key)
+                self._values.insert(position, (pk, label))
+            self._by_id[pk] = keys
+
+    def remove(self, pk):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(pk)
+
+    def clear(self):
+        """Forget everything; the next lookup reloads from the database."""
+        with self._lock:
+            self._loaded_at = None
+            self._keys, self._values, self._by_id = [], [], {}
+
+    def _remove(self, pk):
+        for key in self._by_id.pop(pk, ()):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._values[position][0] == pk:
+                    del self._keys[position]
+                    del self._values[position]
+                    break
+                position += 1
+
+
+def _username_keys(username):
+    return [normalize(username)]
+
+
+def _title_keys(title):
+    title = normalize(title)
+    return sorted({title[match.start():] for match in _WORD_START.finditer(title)})
+
+
+users = PrefixIndex(
+    lambda: User.objects.filter(is_active=True).values_list('id', 'username').iterator(),
+    _username_keys,
+)
+post_titles = PrefixIndex(
+    lambda: Post.objects.values_list('id', 'title').iterator(),
+    _title_keys,
+)
@@ -0,0 +1,78 @@
+"""
+Versioned response cache for anonymous post reads.
+
+Cached responses are keyed on version numbers kept in the cache: one
+shared by all post lists and one per post for single-post reads. Any
+change that can alter what a post or a list renders bumps the relevant
+versions after it commits, so later reads use new keys and old entries
+simply expire. Version keys expire too, after ``POST_VERSION_CACHE_TTL``
+seconds, since any id in a URL gets one; a version recreated after that is
+fresh, so this only costs a cache miss. Sources of bumps:
+
+* ``post_save``/``post_delete`` on ``Post``, ``Comment`` and ``Like``
+  (see ``posts.signals``);
+* writes that bypass signals: ``posts.counters.adjust_counter`` and the
+  like/unlike views.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+LIST_VERSION_KEY = 'posts:version:list'
+
+
+def _post_version_key(post_id):
+    return f'posts:version:{post_id}'
+
+
+def _fresh_version():
+    # A version created after eviction must not collide with one used
+    # before, so start from the clock rather than from 1.
+    return time.time_ns()
+
+
+def _version_timeout():
+    # Well above POST_RESPONSE_CACHE_TTL, so live versions rarely churn.
+    return getattr(settings, 'POST_VERSION_CACHE_TTL', 24 * 60 * 60)
+
+
+def versions(*keys):
+    values = cache.get_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in values}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, _version_timeout())
+        values.update(cache.get_many(list(missing)))
+    return [values[key] for key in keys]
+
+
+def _bump_now(post_ids):
+    for key in [LIST_VERSION_KEY] + [_post_version_key(post_id) for post_id in post_ids]:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), _version_timeout())
+
+
+def bump(*post_ids):
+    """Invalidate cached lists, and the given posts, once the current transaction commits."""
+    transaction.on_commit(lambda: _bump_now(post_ids))
+
+
+def response_key(request, post_id=None):
+    """Cache key for an anonymous response to ``request``."""
+    # A single post only changes with its own version.
+    keys = [LIST_VERSION_KEY] if post_id is None else [_post_version_key(post_id)]
+    query = sorted(request.query_params.lists())
+    # The host is part of the key because paginated responses embed
+    # absolute "next" links; the format because ETags depend on it.
+    raw = f'{request.get_host()}|{request.path}|{query}|{request.accepted_renderer.format}'
+    digest = hashlib.sha256(raw.encode()).hexdigest()
+    return f"posts:response:{':'.join(map(str, versions(*keys)))}:{digest}"
+
+
+def timeout():
+    return getattr(settings, 'POST_RESPONSE_CACHE_TTL', 60)
@@ -0,0 +1,70 @@
+"""
+Denormalized like/comment counters on ``Post``.
+
+Counters are adjusted with single ``UPDATE ... SET n = n + delta``
+statements so concurrent writers never lose increments (likes do this as
+part of their own write, see ``posts.likes``), and can be recomputed from
+the source tables with ``reconcile_post_counters``.
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from . import cache
+from .models import Comment, Like, Post
+
+COUNTERS = {
+    'like_count': Like,
+    'comment_count': Comment,
+}
+
+
+def adjust_counter(post_id, field, delta):
+    """Atomically add ``delta`` to ``field`` on a single post."""
+    Post.objects.filter(pk=post_id).update(**{field: F(field) + delta})
+    # update() sends no signals.
+    cache.bump(post_id)
+
+
+def _actual_count(model):
+    counts = (
+        model.objects
+        .filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def reconcile_counters(start_id, batch_size):
+    """
+    Recompute counters for up to ``batch_size`` posts with ``pk > start_id``.
+
+    Returns ``(last_id, fixed)``: the highest primary key examined (``None``
+    once there are no posts left) and the number of posts whose counters
+    had drifted and were rewritten.
+    """
+    posts = list(
+        Post.objects
+        .filter(pk__gt=start_id)
+        .order_by('pk')
+        .annotate(**{f'actual_{field}': _actual_count(model) for field, model in COUNTERS.items()})
+        .only('pk', *COUNTERS)[:batch_size]
+    )
+    if not posts:
+        return None, 0
+
+    drifted = []
+    for post in posts:
+        changed = False
+        for field in COUNTERS:
+            actual = getattr(post, f'actual_{field}')
+            if getattr(post, field) != actual:
+                setattr(post, field, actual)
+                changed = True
+        if changed:
+            drifted.append(post)
+
+    Post.objects.bulk_update(drifted, list(COUNTERS))
+    return posts[-1].pk, len(drifted)
@@ -0,0 +1,212 @@
+"""
+Hybrid push/pull home timelines.
+
+New posts are pushed into every follower's ``TimelineEntry`` rows when they
+are created, so reading the feed never has to touch the follow graph.
+Follow/unfollow events repair the affected timelines.
+
+Authors with at least ``FEED_PULL_FOLLOWER_THRESHOLD`` followers are never
+fanned out; their posts are pulled at read time and merged into the pushed
+timeline, which keeps write amplification bounded for very popular authors.
+"""
+import heapq
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Post, TimelineEntry
+
+User = get_user_model()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def pulled_author_ids(author_ids):
+    """
+    Return the subset of ``author_ids`` whose posts are pulled, not pushed.
+
+    ``author_ids`` may be a list or an ``id`` values queryset, which is
+    sent as a subquery.
+    """
+    threshold = _setting('FEED_PULL_FOLLOWER_THRESHOLD', None)
+    if threshold is None:
+        return set()
+    return set(
+        User.objects
+        .filter(id__in=author_ids, follower_count__gte=threshold)
+        .values_list('id', flat=True)
+    )
+
+
+def fan_out_post(post):
+    """Push ``post`` into the timeline of every follower of its author."""
+    if pulled_author_ids([post.author_id]):
+        return
+
+    batch_size = _setting('FEED_FANOUT_BATCH_SIZE', 1000)
+    follower_ids = post.author.followers.values_list('id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post=post, created_at=post.created_at)
+         for user_id in follower_ids.iterator(chunk_size=batch_size)),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_timelines(edges):
+    """
+    Copy the most recent posts of each followee into the follower's timeline.
+
+    ``edges`` is an iterable of (follower_id, followee_id) tuples. Only the
+    latest ``FEED_BACKFILL_LIMIT`` posts per followee are copied, fetched
+    with a single windowed query. Pulled authors are skipped.
+    """
+    followers_of = defaultdict(list)
+    for follower_id, followee_id in edges:
+        followers_of[followee_id].append(follower_id)
+    for author_id in pulled_author_ids(followers_of):
+        del followers_of[author_id]
+    if not followers_of:
+        return
+
+    limit = _setting('FEED_BACKFILL_LIMIT', 200)
+    recent_posts = (
+        Post.objects
+        .filter(author_id__in=followers_of)
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=F('created_at').desc(),
+        ))
+        .filter(rank__lte=limit)
+        .values_list('id', 'author_id', 'created_at')
+    )
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=follower_id, post_id=post_id, created_at=created_at)
+         for post_id, author_id, created_at in recent_posts
+         for follower_id in followers_of[author_id]),
+        batch_size=_setting('FEED_FANOUT_BATCH_SIZE', 1000),
+        ignore_conflicts=True,
+    )
+
+
+def prune_timelines(edges):
+    """Remove the followee's posts from each follower's timeline."""
+    condition = Q()
+    for follower_id, followee_id in edges:
+        condition |= Q(user_id=follower_id, post__author_id=followee_id)
+    if condition:
+        TimelineEntry.objects.filter(condition).delete()
+
+
+def home_timeline(user):
+    """
+    Posts in ``user``'s materialized timeline, newest first.
+
+    ``feed_at`` is the timeline entry's copy of the post timestamp, so
+    ordering and keyset filtering run on the (user, created_at) index.
+    """
+    return (
+        Post.objects
+        .filter(timeline_entries__user=user)
+        .annotate(feed_at=F('timeline_entries__created_at'))
+        .order_by('-feed_at', '-id')
+    )
+
+
+class MergedFeed:
+    """
+    Several sorted post querysets presented as one sorted queryset.
+
+    Queryset methods such as ``filter()`` and ``order_by()`` are applied to
+    every stream, and slicing reads at most ``stop`` rows from each stream
+    and combines them with a k-way heap merge, so no stream is ever read past
+    the requested page. A post present in more than one stream (for example
+    pushed before its author crossed the pull threshold) is only returned
+    once.
+    """
+
+    def __init__(self, *streams, ordering=('-feed_at', '-id')):
+        self.streams = streams
+        self.ordering = tuple(ordering)
+
+    @property
+    def query(self):
+        # The streams share a model and annotations, so the first one's
+        # query describes the fields of every row.
+        return self.streams[0].query
+
+    def _chain(self, method, *args, ordering=None, **kwargs):
+        return MergedFeed(
+            *(getattr(stream, method)(*args, **kwargs) for stream in self.streams),
+            ordering=ordering or self.ordering,
+        )
+
+    def filter(self, *args, **kwargs):
+        return self._chain('filter', *args, **kwargs)
+
+    def annotate(self, *args, **kwargs):
+        return self._chain('annotate', *args, **kwargs)
+
+    def select_related(self, *fields):
+        return self._chain('select_related', *fields)
+
+    def prefetch_related(self, *lookups):
+        return self._chain('prefetch_related', *lookups)
+
+    def order_by(self, *fields):
+        return self._chain('order_by', *fields, ordering=fields)
+
+    def __iter__(self):
+        return self._merge(None)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start = index.start or 0
+            return list(self._merge(index.stop))[start:]
+        return list(self._merge(index + 1))[index]
+
+    def _sort_key(self, post):
+        return tuple(getattr(post, field.lstrip('-')) for field in self.ordering)
+
+    def _merge(self, limit):
+        streams = [stream if limit is None else stream[:limit] for stream in self.streams]
+        descending = self.ordering[0].startswith('-')
+        merged = heapq.merge(*streams, key=self._sort_key, reverse=descending)
+        return islice(self._unique(merged), limit)
+
+    @staticmethod
+    def _unique(posts):
+        seen = set()
+        for post in posts:
+            if post.pk not in seen:
+                seen.add(post.pk)
+                yield post
+
+
+def home_feed(user):
+    """
+    ``user``'s home feed: the pushed timeline merged with pulled authors.
+
+    Returns a plain queryset when the user follows no pulled authors, so the
+    common case stays a single indexed query.
+    """
+    # A subquery, so the follow list never round-trips through Python.
+    pulled = pulled_author_ids(user.following.values('id'))
+    timeline = home_timeline(user)
+    if not pulled:
+        return timeline
+
+    pulled_posts = (
+        Post.objects
+        .filter(author_id__in=pulled)
+        .annotate(feed_at=F('created_at'))
+        .order_by('-feed_at', '-id')
+    )
+    return MergedFeed(timeline, pulled_posts)
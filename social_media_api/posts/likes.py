@@ -0,0 +1,120 @@
+"""
+Idempotent like/unlike as a single write round trip.
+
+On PostgreSQL the like row and the post's ``like_count`` are changed by one
+statement: a data-modifying CTE inserts (or deletes) the row keyed on the
+``('user', 'post')`` unique constraint and the outer ``UPDATE`` applies the
+resulting delta and returns the new count. SQLite has no data-modifying
+CTEs, so the same two statements run back to back inside one transaction.
+Either way repeated requests are harmless: a duplicate like or a missing
+unlike changes nothing and simply reports the current state.
+
+``liked_by`` covers the read side: the viewer's like state for a whole page
+of posts, computed inside the page query.
+"""
+from django.db import connection, transaction
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.utils import timezone
+
+from .models import Like, Post
+
+
+def _tables():
+    quote = connection.ops.quote_name
+    return quote(Like._meta.db_table), quote(Post._meta.db_table)
+
+
+def _now():
+    return Like._meta.get_field('created_at').get_db_prep_value(timezone.now(), connection)
+
+
+def like_post(user, post_id):
+    """
+    Like ``post_id`` as ``user``.
+
+    Returns ``(created, like_count, author_id)``, or ``None`` when the post
+    does not exist.
+    """
+    like_table, post_table = _tables()
+    insert = f"""
+        INSERT INTO {like_table} (user_id, post_id, created_at)
+        SELECT %s, id, %s FROM {post_table} WHERE id = %s
+        ON CONFLICT (user_id, post_id) DO NOTHING
+    """
+    params = [user.pk, _now(), post_id]
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"""
+                WITH inserted AS ({insert} RETURNING post_id)
+                UPDATE {post_table}
+                SET like_count = like_count + (SELECT COUNT(*) FROM inserted)
+                WHERE id = %s
+                RETURNING (SELECT COUNT(*) FROM inserted), like_count, author_id
+            """, params + [post_id])
+            row = cursor.fetchone()
+        else:
+            with transaction.atomic():
+                cursor.execute(insert, params)
+                created = cursor.rowcount
+                cursor.execute(f"""
+                    UPDATE {post_table} SET like_count = like_count + %s
+                    WHERE id = %s
+                    RETURNING %s, like_count, author_id
+                """, [created, post_id, created])
+                row = cursor.fetchone()
+
+    if row is None:
+        return None
+    created, like_count, author_id = row
+    return bool(created), like_count, author_id
+
+
+def unlike_post(user, post_id):
+    """
+    Remove ``user``'s like from ``post_id``.
+
+    Returns ``(deleted, like_count)``, or ``None`` when the post does not
+    exist.
+    """
+    like_table, post_table = _tables()
+    delete = f"DELETE FROM {like_table} WHERE user_id = %s AND post_id = %s"
+    params = [user.pk, post_id]
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"""
+                WITH deleted AS ({delete} RETURNING post_id)
+                UPDATE {post_table}
+                SET like_count = like_count - (SELECT COUNT(*) FROM deleted)
+                WHERE id = %s
+                RETURNING (SELECT COUNT(*) FROM deleted), like_count
+            """, params + [post_id])
+            row = cursor.fetchone()
+        else:
+            with transaction.atomic():
+                cursor.execute(delete, params)
+                deleted = cursor.rowcount
+                cursor.execute(f"""
+                    UPDATE {post_table} SET like_count = like_count - %s
+                    WHERE id = %s
+                    RETURNING %s, like_count
+                """, [deleted, post_id, deleted])
+                row = cursor.fetchone()
+
+    if row is None:
+        return None
+    deleted, like_count = row
+    return bool(deleted), like_count
+
+
+def liked_by(user):
+    """
+    Expression telling whether ``user`` liked each post in a queryset.
+
+    Annotating with it adds an ``EXISTS`` subquery to the page query itself,
+    so rendering ``liked_by_me`` costs no extra round trips.
+    """
+    if not user.is_authenticated:
+        return Value(False, output_field=BooleanField())
+    return Exists(Like.objects.filter(post=OuterRef('pk'), user=user))
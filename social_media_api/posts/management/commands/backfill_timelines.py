@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.feed import backfill_timelines
+
+Follow = get_user_model().followers.through
+
+
+class Command(BaseCommand):
+    help = "Populate materialized home timelines from the existing follow graph."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of follow edges processed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        processed = 0
+
+        while True:
+            # Walk the through table by primary key so each batch is an
+            # indexed range read regardless of table size.
+            batch = list(
+                Follow.objects
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'to_customuser_id', 'from_customuser_id')[:batch_size]
+            )
+            if not batch:
+                break
+
+            backfill_timelines((follower_id, followee_id) for _, follower_id, followee_id in batch)
+            last_id = batch[-1][0]
+            processed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled timelines for {processed} follow edges."))
@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from posts.models import Post
+from posts.serializers import PostSerializer
+from social_media_api.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = "Time serializing and rendering a page of posts with DRF's JSON renderer and the fast one."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=1000,
+            help="Number of posts on the page.",
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help="Runs per renderer; the best one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        # Unsaved instances: nothing is written and the database is not timed.
+        author = get_user_model()(username='benchmark')
+        now = timezone.now()
+        posts = [
+            Post(
+                id=i, author=author, title=f'Post {i}', content='Lorem ipsum dolor sit amet. ' * 10,
+                created_at=now - timedelta(minutes=i), updated_at=now, like_count=i, comment_count=i // 2,
+            )
+            for i in range(1, options['posts'] + 1)
+        ]
+
+        renderers = [('JSONRenderer', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())]
+        for name, renderer in renderers:
+            best = min(self._run(renderer, posts) for _ in range(options['repeat']))
+            self.stdout.write(f"{name}: {best * 1000:.1f} ms")
+
+        backend = 'orjson' if orjson is not None else 'json (orjson not installed)'
+        self.stdout.write(self.style.SUCCESS(f"Rendered {len(posts)} posts; FastJSONRenderer used {backend}."))
+
+    def _run(self, renderer, posts):
+        started = time.perf_counter()
+        renderer.render({'next': None, 'results': PostSerializer(posts, many=True).data})
+        return time.perf_counter() - started
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import rebuild_indexes
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for posts and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Rows indexed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild_indexes(batch_size=options['batch_size'])
+        summary = ', '.join(f"{count} {label}" for label, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index: {summary}."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute drifted like/comment counters on posts in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of posts checked per batch.",
+        )
+
+    def handle(self, *args, **options):
+        last_id = 0
+        fixed = 0
+
+        while True:
+            last_id, drifted = reconcile_counters(last_id, options['batch_size'])
+            if last_id is None:
+                break
+            fixed += drifted
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled counters, {fixed} posts corrected."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:03
+
+from django.db import migrations
+
+# (model, columns) for each full-text index, see posts.search.
+INDEXES = [
+    ('Post', ['title', 'content']),
+    ('Comment', ['content']),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    for model_name, columns in INDEXES:
+        model = apps.get_model('posts', model_name)
+        table = model._meta.db_table
+        if connection.vendor == 'sqlite':
+            fts = quote(f'{table}_fts')
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, tokenize='porter unicode61')"
+            )
+            schema_editor.execute(
+                f"INSERT INTO {fts} (rowid, {', '.join(columns)}) "
+                f"SELECT id, {', '.join(quote(column) for column in columns)} FROM {quote(table)}"
+            )
+        elif connection.vendor == 'postgresql':
+            document = " || ' ' || ".join(f"coalesce({quote(column)}, '')" for column in columns)
+            schema_editor.execute(
+                f"CREATE INDEX {quote(f'{table}_search_idx')} ON {quote(table)} "
+                f"USING GIN (to_tsvector('english', {document}))"
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    for model_name, _ in INDEXES:
+        table = apps.get_model('posts', model_name)._meta.db_table
+        if connection.vendor == 'sqlite':
+            schema_editor.execute(f"DROP TABLE IF EXISTS {quote(f'{table}_fts')}")
+        elif connection.vendor == 'postgresql':
+            schema_editor.execute(f"DROP INDEX IF EXISTS {quote(f'{table}_search_idx')}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,209 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max, Q, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from . import cache as response_cache
+
+
+class RelatedQuerysetMixin:
+    """
+    Applies a view's declared relation needs to every queryset it serves.
+
+    Views list the relations their serializer renders in
+    ``select_related_fields`` and ``prefetch_related_fields``; they are added
+    in ``filter_queryset`` so list, retrieve and custom ``get_queryset``
+    implementations all pick them up without repeating the calls.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+
+class SparseFieldsetMixin:
+    """
+    Loads only the columns a ``?fields=`` subset needs.
+
+    When the serializer (see ``posts.serializers.DynamicFieldsMixin``) is
+    narrowed, the queryset is narrowed with ``.only()`` to the primary key,
+    the model fields the selected fields read and the keyset ordering
+    fields, which cursors are built from. ``select_related`` relations that
+    are no longer rendered are dropped. The queryset is left alone when a
+    selected field cannot be mapped to concrete model fields.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        sources = getattr(serializer, 'get_sparse_sources', lambda: None)()
+        if sources is None or queryset.query.select_related is True:
+            return queryset
+
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        for name in sources:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return queryset
+            if not field.concrete or field.many_to_many:
+                return queryset
+            columns.add(field.name)
+        for name in self.get_cursor_fields():
+            try:
+                if opts.get_field(name).concrete:
+                    columns.add(name)
+            except FieldDoesNotExist:
+                # Annotations such as the search rank are always loaded.
+                pass
+
+        related = [path for path in _select_related_paths(queryset.query.select_related or {})
+                   if path.split('__')[0] in columns]
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+    def get_cursor_fields(self):
+        ordering = getattr(self, 'cursor_ordering', None) or getattr(self.paginator, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return [field.lstrip('-') for field in ordering]
+
+
+def _select_related_paths(tree, prefix=''):
+    for name, children in tree.items():
+        yield prefix + name
+        yield from _select_related_paths(children, f'{prefix}{name}__')
+
+
+class CachedResponseMixin:
+    """
+    Serves anonymous ``list`` and ``retrieve`` responses from the cache.
+
+    Authenticated requests are never cached, since their responses carry
+    per-user fields such as ``liked_by_me``. Keys are versioned, see
+    ``posts.cache``, so edits show up on the next read.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, None, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        post_id = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self._cached(request, post_id, super().retrieve, *args, **kwargs)
+
+    def _cached(self, request, post_id, handler, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache.response_key(request, post_id)
+        entry = cache.get(key)
+        if entry is not None:
+            data, headers = entry
+            response = get_conditional_response(request, etag=headers.get('ETag'))
+            if response is None:
+                response = Response(data)
+            for name, value in headers.items():
+                response.headers[name] = value
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Validators set by ConditionalGetMixin are kept with the data.
+            headers = {name: response.headers[name] for name in ('ETag', 'Last-Modified') if name in response.headers}
+            cache.set(key, (response.data, headers), response_cache.timeout())
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for ``list`` and ``retrieve``.
+
+    Before serializing, one cheap query computes a validator for the rows
+    the response would contain: ``updated_at`` plus any
+    ``conditional_sum_fields`` (counters changed with ``update()``, which
+    leaves ``updated_at`` alone). For a single object or a keyset page
+    those columns are read for just those rows; an unpaginated list is
+    summarized with ``max(updated_at)``, ``count`` and the field sums. When
+    the client's ``If-None-Match`` matches, a 304 is returned without
+    loading or serializing anything.
+
+    Per-viewer annotations the response renders (``liked_by_me``) are
+    listed in ``conditional_user_fields`` and hashed too, since another
+    user's like can leave the counters exactly as they were.
+
+    ``Last-Modified`` is only sent for single objects without sum or user
+    fields: elsewhere deletions and counter changes do not move
+    ``updated_at``, so clients must rely on the ETag.
+    """
+    conditional_sum_fields = ()
+    conditional_user_fields = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(request, queryset, False, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            # A malformed lookup ("abc" for an integer id); get_object()
+            # turns it into a 404.
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional(request, queryset, True, super().retrieve, *args, **kwargs)
+
+    def get_validators(self, request, queryset, single):
+        """Return ``(etag, last_modified)`` for ``queryset``, or ``(None, None)`` if it is empty."""
+        fields = ('updated_at',) + tuple(self.conditional_sum_fields) + tuple(self.conditional_user_fields)
+        get_page_queryset = getattr(self.paginator, 'get_page_queryset', None)
+        if single:
+            state = list(queryset.values_list('pk', *fields)[:1])
+            if not state:
+                return None, None
+        elif get_page_queryset is not None:
+            state = list(get_page_queryset(queryset, request, self).values_list('pk', *fields))
+        else:
+            stats = queryset.order_by().aggregate(
+                _updated=Max('updated_at'),
+                _count=Count('pk'),
+                **{f'_{field}': Sum(field) for field in self.conditional_sum_fields},
+                **{f'_{field}': Count('pk', filter=Q(**{field: True})) for field in self.conditional_user_fields},
+            )
+            state = sorted(stats.items())
+
+        # Responses differ per user (e.g. liked_by_me) and per format.
+        parts = [request.user.pk, request.accepted_renderer.format, state]
+        etag = quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+        last_modified = None
+        if single and not self.conditional_sum_fields and not self.conditional_user_fields:
+            # HTTP dates have one-second resolution.
+            last_modified = int(state[0][1].timestamp())
+        return etag, last_modified
+
+    def _conditional(self, request, queryset, single, handler, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, queryset, single)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
@@ -15,6 +15,16 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized counters, see posts.counters.
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Matches the (created_at, id) keyset used for cursor pagination.
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -36,6 +46,12 @@ class Comment(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comment_created_id_idx'),
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author}"
 
@@ -60,3 +76,34 @@ class Like(models.Model):
 
     def __str__(self):
         return f"{self.user} liked {self.post}"
+
+
+class TimelineEntry(models.Model):
+    """
+    Materialized home timeline: one row per (reader, post).
+
+    ``created_at`` is copied from the post so a user's feed is a single
+    range scan on (user, created_at) instead of an IN-subquery over the
+    follow graph.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post} in {self.user}'s timeline"
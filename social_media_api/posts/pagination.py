@@ -0,0 +1,130 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .search import RANK_FIELD
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination keyed on a unique ordering, (created_at, id) by
+    default.
+
+    Each page is fetched with a ``WHERE (created_at, id) < cursor`` range
+    condition instead of ``OFFSET``, so deep pages cost the same as the first
+    one, and no ``COUNT(*)`` is issued. Views may set ``cursor_ordering`` to
+    page on different fields; the last field must be unique. Full-text
+    search results (see ``posts.search``) are paged by ``search_rank`` first.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """The rows of the requested page, plus one to tell whether another follows."""
+        self.request = request
+        self.ordering = tuple(getattr(view, 'cursor_ordering', type(self).ordering))
+        if RANK_FIELD in getattr(getattr(queryset, 'query', None), 'annotations', ()):
+            self.ordering = (f'-{RANK_FIELD}',) + self.ordering
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request, queryset)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(cursor))
+        return queryset.order_by(*self.ordering)[:page_size + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = list(self.get_page_queryset(queryset, request, view))
+        page_size = self.get_page_size(request)
+        self.page = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        return self.page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def after(self, values):
+        """Build the keyset condition selecting rows past ``values``."""
+        condition = Q()
+        for position, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[position]})
+            for previous, value in zip(self.ordering[:position], values):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, row):
+        values = [getattr(row, field.lstrip('-')) for field in self.ordering]
+        # default=str keeps full microsecond precision for datetimes, which
+        # DjangoJSONEncoder would truncate to milliseconds.
+        data = json.dumps(values, default=str).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering) or None in values:
+                raise ValueError
+            # Typed values, so a tampered cursor fails here rather than in the query.
+            return [
+                self.get_ordering_field(queryset, field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_ordering_field(self, queryset, name):
+        """The model or annotation field behind the ordering field ``name``."""
+        query = queryset.query
+        if name in query.annotations:
+            return query.annotations[name].output_field
+        opts = query.get_meta()
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
@@ -0,0 +1,184 @@
+"""
+Full-text search for posts and comments.
+
+``FullTextSearchFilter`` replaces DRF's ``SearchFilter`` (``ILIKE '%term%'``,
+a full scan per search) for models with a search index:
+
+* On SQLite each indexed model has an FTS5 table (``<table>_fts``) keyed by
+  the row's primary key. ``posts.signals`` keeps it in sync on save and
+  delete; writes that bypass signals (``bulk_create``, ``update``) need
+  ``rebuild_search_index``.
+* On PostgreSQL a GIN index on the ``to_tsvector`` of the same columns is
+  kept up to date by the database itself.
+
+Matches are annotated with ``search_rank`` (higher is better), which
+``KeysetPagination`` pages on before the view's usual ordering. On other
+databases, or before the index exists, the filter falls back to
+``SearchFilter``. The tables and indexes are created by migration
+``0006_search_index``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+from . import cache
+from .models import Comment, Post
+
+RANK_FIELD = 'search_rank'
+TSVECTOR_CONFIG = 'english'
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+class SearchIndex:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self._available = False
+
+    @property
+    def table(self):
+        return f'{self.model._meta.db_table}_fts'
+
+    def is_available(self):
+        if connection.vendor == 'postgresql':
+            return True
+        if connection.vendor != 'sqlite':
+            return False
+        # Only a positive answer is remembered, so the index is picked up
+        # as soon as the migration has run.
+        if not self._available:
+            self._available = self.table in connection.introspection.table_names()
+        return self._available
+
+    # Sync (SQLite only; PostgreSQL maintains its index)
+
+    def _maintained(self):
+        return connection.vendor == 'sqlite' and self.is_available()
+
+    def update(self, instance):
+        if not self._maintained():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {_quote(self.table)} WHERE rowid = %s", [instance.pk])
+            cursor.execute(
+                f"INSERT INTO {_quote(self.table)} (rowid, {', '.join(self.fields)}) "
+                f"VALUES (%s{', %s' * len(self.fields)})",
+                [instance.pk] + [getattr(instance, field) for field in self.fields],
+            )
+
+    def remove(self, pk):
+        if not self._maintained():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {_quote(self.table)} WHERE rowid = %s", [pk])
+
+    def rebuild(self, batch_size=1000):
+        """Re-index every row in primary key batches; returns the number indexed."""
+        if not self._maintained():
+            return 0
+        columns = ', '.join(self.fields)
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+        indexed = 0
+        last_pk = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {_quote(self.table)}")
+            while True:
+                rows = list(
+                    self.model.objects
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .values_list('pk', *self.fields)[:batch_size]
+                )
+                if not rows:
+                    break
+                cursor.executemany(
+                    f"INSERT INTO {_quote(self.table)} (rowid, {columns}) VALUES ({placeholders})",
+                    rows,
+                )
+                last_pk = rows[-1][0]
+                indexed += len(rows)
+        return indexed
+
+    # Querying
+
+    def _tsvector(self):
+        document = " || ' ' || ".join(f"coalesce({_quote(field)}, '')" for field in self.fields)
+        return f"to_tsvector('{TSVECTOR_CONFIG}', {document})"
+
+    def search(self, queryset, terms):
+        """Filter ``queryset`` to rows matching all ``terms``, annotated with ``search_rank``."""
+        pk = f"{_quote(self.model._meta.db_table)}.{_quote(self.model._meta.pk.column)}"
+        if connection.vendor == 'postgresql':
+            query = f"plainto_tsquery('{TSVECTOR_CONFIG}', %s)"
+            text = ' '.join(terms)
+            # ts_rank returns real; as double precision the value round-trips
+            # exactly through keyset cursors (search_rank < / = cursor).
+            return queryset.filter(
+                RawSQL(f"{self._tsvector()} @@ {query}", [text], output_field=BooleanField()),
+            ).annotate(**{
+                RANK_FIELD: RawSQL(
+                    f"ts_rank({self._tsvector()}, {query})::double precision",
+                    [text],
+                    output_field=FloatField(),
+                ),
+            })
+
+        # FTS5 query syntax: each term quoted (so user input cannot inject
+        # operators), juxtaposed terms are ANDed. bm25 ranks lower-is-better.
+        match = ' '.join('"%s"' % term for term in terms)
+        table = _quote(self.table)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match]),
+        ).annotate(**{
+            RANK_FIELD: RawSQL(
+                f"(SELECT -rank FROM {table} WHERE {table} MATCH %s AND rowid = {pk})",
+                [match],
+                output_field=FloatField(),
+            ),
+        })
+
+
+SEARCH_INDEXES = {
+    Post: SearchIndex(Post, ['title', 'content']),
+    Comment: SearchIndex(Comment, ['content']),
+}
+
+
+def rebuild_indexes(batch_size=1000):
+    """Rebuild every search index; returns ``{model label: rows indexed}``."""
+    counts = {
+        model._meta.label: index.rebuild(batch_size)
+        for model, index in SEARCH_INDEXES.items()
+    }
+    # Cached search results may change.
+    cache.bump()
+    return counts
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for ``SearchFilter`` backed by the search index.
+
+    Uses the same ``?search=`` parameter. Views keep ``search_fields`` for
+    the ``SearchFilter`` fallback used when the model has no index.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index = SEARCH_INDEXES.get(queryset.model)
+        if index is None or not index.is_available():
+            return super().filter_queryset(request, queryset, view)
+
+        terms = [
+            term
+            for param in self.get_search_terms(request)
+            for term in re.findall(r'\w+', param)
+        ]
+        if not terms:
+            return queryset
+        return index.search(queryset, terms)
@@ -1,15 +1,65 @@
 from rest_framework import serializers
 from .models import Post, Comment
-class PostSerializer(serializers.ModelSerializer):
+
+
+class DynamicFieldsMixin:
+  """
+  Lets clients ask for a subset of fields with ``?fields=id,title``.
+
+  Only reads are narrowed; unknown names are ignored. ``SparseFieldsetMixin``
+  uses ``get_sparse_sources`` to load just the columns those fields read.
+  Method fields are mapped to the model fields they read in
+  ``field_sources``; an unmapped one disables that narrowing.
+  """
+  fields_query_param = 'fields'
+  field_sources = {}
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.sparse = False
+    request = self.context.get('request')
+    if request is None or request.method not in ('GET', 'HEAD'):
+      return
+    requested = {name.strip() for name in request.query_params.get(self.fields_query_param, '').split(',')}
+    selected = requested & set(self.fields)
+    if selected:
+      for name in set(self.fields) - selected:
+        self.fields.pop(name)
+      self.sparse = True
+
+  def get_sparse_sources(self):
+    """Model fields read by the selected fields, or None if not narrowed."""
+    if not self.sparse:
+      return None
+    sources = set()
+    for name, field in self.fields.items():
+      if name in self.field_sources:
+        sources.update(self.field_sources[name])
+      elif field.source == '*':
+        return None
+      else:
+        sources.add(field.source_attrs[0])
+    return sources
+
+
+class PostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
   author = serializers.StringRelatedField(read_only=True)
+  liked_by_me = serializers.SerializerMethodField()
 
   class Meta:
     model = Post
-    fields = ['id','author','title', 'content', 'created_at', 'updated_at',]
+    fields = ['id','author','title', 'content', 'created_at', 'updated_at', 'like_count', 'comment_count', 'liked_by_me',]
+    read_only_fields = ['like_count', 'comment_count']
+  # An annotation, see get_liked_by_me.
+  field_sources = {'liked_by_me': ()}
+
+  def get_liked_by_me(self, obj):
+    # Annotated by the views with posts.likes.liked_by for the whole page.
+    return getattr(obj, 'liked_by_me', False)
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
   author = serializers.StringRelatedField(read_only=True)
-  post = serializers.PrimaryKeyRelatedField(read_only=True)
+  post = serializers.PrimaryKeyRelatedField(queryset=Post.objects.all())
 
   class Meta:
     model = Comment
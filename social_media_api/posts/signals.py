@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from accounts.signals import users_followed, users_unfollowed
+
+from . import autocomplete, cache
+from .feed import backfill_timelines, prune_timelines
+from .models import Comment, Like, Post
+from .search import SEARCH_INDEXES
+
+
+@receiver(users_followed)
+def add_followed_posts_to_timeline(sender, edges, **kwargs):
+    backfill_timelines(edges)
+
+
+@receiver(users_unfollowed)
+def remove_unfollowed_posts_from_timeline(sender, edges, **kwargs):
+    prune_timelines(edges)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, **kwargs):
+    SEARCH_INDEXES[sender].update(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    SEARCH_INDEXES[sender].remove(instance.pk)
+
+
+# The autocomplete indexes change only once the write commits, so a rolled
+# back save leaves no entry behind. Values are captured first: a deleted
+# instance loses its pk.
+
+@receiver(post_save, sender=Post)
+def update_title_autocomplete(sender, instance, **kwargs):
+    pk, title = instance.pk, instance.title
+    transaction.on_commit(lambda: autocomplete.post_titles.update(pk, title))
+
+
+@receiver(post_delete, sender=Post)
+def remove_title_autocomplete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.post_titles.remove(pk))
+
+
+@receiver(post_save, sender=CustomUser)
+def update_username_autocomplete(sender, instance, **kwargs):
+    pk, username = instance.pk, instance.username
+    if instance.is_active:
+        transaction.on_commit(lambda: autocomplete.users.update(pk, username))
+    else:
+        transaction.on_commit(lambda: autocomplete.users.remove(pk))
+
+
+@receiver(post_delete, sender=CustomUser)
+def remove_username_autocomplete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.users.remove(pk))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    cache.bump(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def invalidate_cached_post_of_child(sender, instance, **kwargs):
+    cache.bump(instance.post_id)
@@ -1,7 +1,28 @@
+import base64
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from rest_framework.test import APITestCase
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from rest_framework import status
 
+from notifications.dispatch import drain
+from notifications.models import Notification
+from social_media_api import renderers
+
+from . import autocomplete
+from .feed import fan_out_post
+from .models import Comment, Like, Post, TimelineEntry
+
 User = get_user_model()
 
 class PostTests(APITestCase):
@@ -13,8 +34,534 @@ class PostTests(APITestCase):
 
     def test_create_post_authenticated(self):
         self.client.force_authenticate(user=self.user)
-        response = self.client.post('/posts/', {
+        response = self.client.post(reverse('post-list'), {
             'title': 'Test',
             'content': 'Testing'
         })
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class QueryBudgetMixin:
+    """Assertions that an endpoint's query count does not grow with page size."""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def assertQueryBudget(self, url, small=2, large=10):
+        separator = '&' if '?' in url else '?'
+        # Warm per-process caches first.
+        self.client.get(url)
+        self.assertEqual(
+            self.count_queries(f'{url}{separator}page_size={small}'),
+            self.count_queries(f'{url}{separator}page_size={large}'),
+            f"Query count for {url} grows with page size",
+        )
+
+
+class ListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader', password='pass123')
+        for i in range(10):
+            author = User.objects.create_user(username=f'author{i}', password='pass123')
+            self.reader.following.add(author)
+            post = Post.objects.create(author=author, title=f'Post {i}', content='...')
+            fan_out_post(post)
+            Comment.objects.create(author=author, post=post, content='...')
+
+    def test_post_list(self):
+        self.assertQueryBudget(reverse('post-list'))
+
+    def test_comment_list(self):
+        self.assertQueryBudget(reverse('comment-list'))
+
+    def test_feed(self):
+        self.client.force_authenticate(user=self.reader)
+        self.assertQueryBudget(reverse('feed'))
+
+    def test_liked_by_me_is_computed_in_the_page_query(self):
+        liked = Post.objects.get(title='Post 3')
+        Like.objects.create(user=self.reader, post=liked)
+        self.client.force_authenticate(user=self.reader)
+
+        self.assertQueryBudget(reverse('post-list'))
+        response = self.client.get(reverse('post-list'))
+        flags = {post['title']: post['liked_by_me'] for post in response.data['results']}
+        self.assertTrue(flags.pop('Post 3'))
+        self.assertFalse(any(flags.values()))
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test', password='pass123')
+        for i in range(5):
+            Post.objects.create(author=self.user, title=f'Post {i}', content='...')
+
+    def test_pages_walk_every_post_once_without_count(self):
+        titles = []
+        url = reverse('post-list') + '?page_size=2'
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn('count', response.data)
+                titles += [post['title'] for post in response.data['results']]
+                url = response.data['next']
+
+        self.assertEqual(titles, [f'Post {i}' for i in reversed(range(5))])
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('post-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_invalid_values_is_rejected(self):
+        for values in (['garbage', 'x'], [None, 1], [{}, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get(reverse('post-list'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CounterTests(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.reader = User.objects.create_user(username='reader', password='pass123')
+        self.post = Post.objects.create(author=self.author, title='Post', content='...')
+        self.client.force_authenticate(user=self.reader)
+
+    def test_like_and_comment_counters(self):
+        self.client.post(reverse('like-post', args=[self.post.pk]))
+        response = self.client.post(reverse('comment-list'), {'post': self.post.pk, 'content': 'Nice'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(reverse('post-detail', args=[self.post.pk]))
+        self.assertEqual(response.data['like_count'], 1)
+        self.assertEqual(response.data['comment_count'], 1)
+
+        self.client.post(reverse('unlike-post', args=[self.post.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_like_and_unlike_are_idempotent(self):
+        url = reverse('like-post', args=[self.post.pk])
+        first = self.client.post(url)
+        second = self.client.post(url)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['like_count'], 1)
+        self.assertEqual(Like.objects.filter(post=self.post).count(), 1)
+        drain()
+        self.assertEqual(Notification.objects.filter(recipient=self.author).count(), 1)
+
+        url = reverse('unlike-post', args=[self.post.pk])
+        for _ in range(2):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {'detail': 'Post unliked!', 'liked': False, 'like_count': 0})
+
+    def test_like_missing_post(self):
+        response = self.client.post(reverse('like-post', args=[self.post.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reconcile_command_fixes_drift(self):
+        Like.objects.create(user=self.reader, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(like_count=7, comment_count=3)
+
+        call_command('reconcile_post_counters', batch_size=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (1, 0))
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.reader = User.objects.create_user(username='reader', password='pass123')
+
+    def feed_titles(self):
+        self.client.force_authenticate(user=self.reader)
+        titles = []
+        url = reverse('feed') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += [post['title'] for post in response.data['results']]
+            url = response.data['next']
+        return titles
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        self.reader.following.add(self.author)
+        self.client.force_authenticate(user=self.author)
+        self.client.post(reverse('post-list'), {'title': 'Hello', 'content': 'World'})
+
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post__title='Hello').exists())
+        self.assertEqual(self.feed_titles(), ['Hello'])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        Post.objects.create(author=self.author, title='Earlier', content='...')
+
+        self.client.force_authenticate(user=self.reader)
+        self.client.post(reverse('follow-user', args=[self.author.id]))
+        self.assertEqual(self.feed_titles(), ['Earlier'])
+
+        self.client.post(reverse('unfollow-user', args=[self.author.id]))
+        self.assertEqual(self.feed_titles(), [])
+
+    def test_backfill_command_rebuilds_timelines(self):
+        self.reader.following.add(self.author)
+        Post.objects.create(author=self.author, title='Old', content='...')
+        TimelineEntry.objects.all().delete()
+
+        call_command('backfill_timelines', stdout=StringIO())
+        self.assertEqual(self.feed_titles(), ['Old'])
+
+    @override_settings(FEED_PULL_FOLLOWER_THRESHOLD=2)
+    def test_popular_authors_are_pulled_and_merged(self):
+        celebrity = User.objects.create_user(username='celebrity', password='pass123')
+        fan = User.objects.create_user(username='fan', password='pass123')
+        celebrity.followers.add(self.reader, fan)
+        self.reader.following.add(self.author)
+
+        Post.objects.create(author=celebrity, title='Pulled 1', content='...')
+        self.client.force_authenticate(user=self.author)
+        self.client.post(reverse('post-list'), {'title': 'Pushed', 'content': '...'})
+        self.client.force_authenticate(user=celebrity)
+        self.client.post(reverse('post-list'), {'title': 'Pulled 2', 'content': '...'})
+
+        self.assertFalse(TimelineEntry.objects.filter(post__author=celebrity).exists())
+        self.assertEqual(self.feed_titles(), ['Pulled 2', 'Pushed', 'Pulled 1'])
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass123')
+
+    def post(self, title, content='...'):
+        return Post.objects.create(author=self.author, title=title, content=content)
+
+    def search(self, url, query, page_size=10):
+        titles = []
+        url = f'{url}?search={query}&page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += [row.get('title', row.get('content')) for row in response.data['results']]
+            url = response.data['next']
+        return titles
+
+    def test_results_are_ranked_and_paged(self):
+        self.post('Once', 'django is mentioned here with a lot of other words around it')
+        self.post('Thrice', 'django django django')
+        self.post('Unrelated', 'nothing to see')
+        self.post('Twice', 'django and more django')
+
+        self.assertEqual(self.search(reverse('post-list'), 'django', page_size=1), ['Thrice', 'Twice', 'Once'])
+
+    def test_stemming_and_all_terms_required(self):
+        self.post('Testing', 'running the suite')
+        self.post('Other', 'running late')
+
+        self.assertEqual(self.search(reverse('post-list'), 'run suite'), ['Testing'])
+        self.assertEqual(self.search(reverse('post-list'), '"; DROP TABLE'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        post = self.post('Before')
+        post.title = 'After'
+        post.save()
+        self.assertEqual(self.search(reverse('post-list'), 'after'), ['After'])
+        self.assertEqual(self.search(reverse('post-list'), 'before'), [])
+
+        comment = Comment.objects.create(author=self.author, post=post, content='great point')
+        self.assertEqual(self.search(reverse('comment-list'), 'point'), ['great point'])
+        comment.delete()
+        self.assertEqual(self.search(reverse('comment-list'), 'point'), [])
+
+    def test_rebuild_command_indexes_bulk_writes(self):
+        Post.objects.bulk_create([Post(author=self.author, title='Bulk', content='imported')])
+        self.assertEqual(self.search(reverse('post-list'), 'imported'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search(reverse('post-list'), 'imported'), ['Bulk'])
+
+
+class AutocompleteTests(APITestCase):
+    def setUp(self):
+        autocomplete.users.clear()
+        autocomplete.post_titles.clear()
+        self.author = User.objects.create_user(username='Dana', password='pass123')
+        User.objects.create_user(username='daniel', password='pass123')
+        User.objects.create_user(username='bob', password='pass123')
+        Post.objects.create(author=self.author, title='Learning Django', content='...')
+        Post.objects.create(author=self.author, title='Crème brûlée', content='...')
+
+    def complete(self, query, **params):
+        response = self.client.get(reverse('autocomplete'), {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return (
+            [user['username'] for user in response.data['users']],
+            [post['title'] for post in response.data['posts']],
+        )
+
+    def test_prefixes_match_usernames_and_title_words(self):
+        self.assertEqual(self.complete('DAN'), (['Dana', 'daniel'], []))
+        self.assertEqual(self.complete('dja'), ([], ['Learning Django']))
+        self.assertEqual(self.complete('brule'), ([], ['Crème brûlée']))
+        self.assertEqual(self.complete('da', limit=1), (['Dana'], []))
+
+    def test_lookups_are_served_from_memory(self):
+        self.complete('d')
+        with CaptureQueriesContext(connection) as queries:
+            self.complete('le')
+        self.assertEqual(len(queries), 0)
+
+    def test_index_follows_renames_and_deletes(self):
+        self.complete('d')
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.get(title='Learning Django')
+            post.title = 'Flask notes'
+            post.save()
+            User.objects.filter(username='bob').delete()
+            daniel = User.objects.get(username='daniel')
+            daniel.is_active = False
+            daniel.save()
+
+        self.assertEqual(self.complete('dja'), ([], []))
+        self.assertEqual(self.complete('fla'), ([], ['Flask notes']))
+        self.assertEqual(self.complete('b'), ([], ['Crème brûlée']))
+        self.assertEqual(self.complete('dan'), (['Dana'], []))
+
+    def test_rolled_back_saves_leave_no_entries(self):
+        self.complete('d')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Post.objects.create(author=self.author, title='Phantom post', content='...')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.complete('phan'), ([], []))
+
+    @override_settings(AUTOCOMPLETE_MAX_KEY_LENGTH=5)
+    def test_queries_longer_than_the_keys_still_match(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.author, title='Learning Djangology', content='...')
+        self.assertEqual(self.complete('learning djangol'), ([], ['Learning Djangology']))
+        self.assertEqual(self.complete('learning djangos'), ([], []))
+        self.assertEqual(self.complete('learning d'), ([], ['Learning Django', 'Learning Djangology']))
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.reader = User.objects.create_user(username='reader', password='pass123')
+        self.post = Post.objects.create(author=self.author, title='Hot', content='...')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, len(queries)
+
+    def test_anonymous_reads_are_served_from_cache(self):
+        for url in (reverse('post-list'), reverse('post-detail', args=[self.post.pk])):
+            first, cold = self.get(url)
+            second, warm = self.get(url)
+            self.assertGreater(cold, 0)
+            self.assertEqual(warm, 0)
+            self.assertEqual(first, second)
+
+    def test_writes_invalidate_cached_responses(self):
+        detail = reverse('post-detail', args=[self.post.pk])
+        self.get(reverse('post-list'))
+        self.get(detail)
+
+        self.client.force_authenticate(user=self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('like-post', args=[self.post.pk]))
+            self.client.post(reverse('comment-list'), {'post': self.post.pk, 'content': 'Nice'})
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.get(detail)[0]['like_count'], 1)
+        self.assertEqual(self.get(reverse('post-list'))[0]['results'][0]['comment_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Edited'
+            self.post.save()
+        self.assertEqual(self.get(detail)[0]['title'], 'Edited')
+        self.assertEqual(self.get(reverse('post-list'))[0]['results'][0]['title'], 'Edited')
+
+    def test_authenticated_reads_are_not_cached(self):
+        self.get(reverse('post-list'))
+        Like.objects.create(user=self.reader, post=self.post)
+
+        self.client.force_authenticate(user=self.reader)
+        data, queries = self.get(reverse('post-list'))
+        self.assertGreater(queries, 0)
+        self.assertTrue(data['results'][0]['liked_by_me'])
+
+    def test_version_keys_expire(self):
+        # Any id in the URL, existing or not, gets a version key.
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            self.client.get(reverse('post-detail', args=[self.post.pk + 1000]))
+        timeouts = [call.args[2] for call in add.call_args_list if call.args[0].startswith('posts:version:')]
+        self.assertEqual(timeouts, [settings.POST_VERSION_CACHE_TTL])
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.posts = [
+            Post.objects.create(author=self.author, title=f'Post {i}', content='...') for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.author)
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=headers)
+        return response, len(queries)
+
+    def test_unchanged_list_returns_304_after_one_query(self):
+        url = reverse('post-list') + '?page_size=2'
+        response, _ = self.get(url)
+        etag = response.headers['ETag']
+
+        response, queries = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(queries, 1)
+
+    def test_counter_changes_and_deletes_change_the_etag(self):
+        url = reverse('post-list') + '?page_size=2'
+        etag = self.get(url)[0].headers['ETag']
+
+        self.client.post(reverse('like-post', args=[self.posts[2].pk]))
+        response, _ = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response.headers['ETag']
+        self.posts[2].delete()
+        self.assertEqual(self.get(url, if_none_match=etag)[0].status_code, status.HTTP_200_OK)
+
+    def test_comment_detail_supports_last_modified(self):
+        comment = Comment.objects.create(author=self.author, post=self.posts[0], content='First')
+        url = reverse('comment-detail', args=[comment.pk])
+        last_modified = self.get(url)[0].headers['Last-Modified']
+
+        response, _ = self.get(url, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # An edit a few seconds later.
+        Comment.objects.filter(pk=comment.pk).update(
+            content='Edited', updated_at=comment.updated_at + timedelta(seconds=5)
+        )
+        response, _ = self.get(url, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_viewers_own_like_changes_the_etag(self):
+        other = User.objects.create_user(username='other', password='pass123')
+        post = self.posts[0]
+        url = reverse('post-detail', args=[post.pk])
+        self.client.force_authenticate(user=other)
+        self.client.post(reverse('like-post', args=[post.pk]))
+
+        self.client.force_authenticate(user=self.author)
+        etag = self.get(url)[0].headers['ETag']
+        # Counters end up exactly as they were.
+        self.client.post(reverse('like-post', args=[post.pk]))
+        self.client.force_authenticate(user=other)
+        self.client.post(reverse('unlike-post', args=[post.pk]))
+
+        self.client.force_authenticate(user=self.author)
+        response, _ = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['liked_by_me'])
+
+    def test_malformed_id_is_not_found(self):
+        for name in ('post-detail', 'comment-detail'):
+            url = reverse(name, args=['abc'])
+            self.assertEqual(self.get(url)[0].status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_anonymous_response_revalidates_without_queries(self):
+        self.client.force_authenticate(user=None)
+        url = reverse('post-detail', args=[self.posts[0].pk])
+        etag = self.get(url)[0].headers['ETag']
+
+        response, queries = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(queries, 0)
+
+
+class JSONRendererTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.post = Post.objects.create(author=self.author, title='Café', content='...')
+
+    def test_datetimes_keep_microseconds_and_utc_z(self):
+        response = self.client.get(reverse('post-detail', args=[self.post.pk]))
+        created_at = self.post.created_at.isoformat().replace('+00:00', 'Z')
+        self.assertIn(f'"created_at":"{created_at}"'.encode(), response.content)
+        self.assertEqual(response.json()['title'], 'Café')
+
+    def test_orjson_and_stdlib_output_match(self):
+        data = {'title': 'Café', 'created_at': self.post.created_at, 'ids': [1, 2]}
+        fast = renderers.dumps(data)
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.dumps(data), fast)
+
+    def test_malformed_json_is_rejected(self):
+        self.client.force_authenticate(user=self.author)
+        response = self.client.post(reverse('post-list'), data='{"title": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass123')
+        self.posts = [
+            Post.objects.create(author=self.author, title=f'Post {i}', content='Long body') for i in range(3)
+        ]
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in queries]
+
+    def test_list_renders_and_loads_only_requested_fields(self):
+        response, queries = self.get(reverse('post-list') + '?fields=id,title&page_size=2')
+        self.assertEqual(response.data['results'][0], {'id': self.posts[2].pk, 'title': 'Post 2'})
+        self.assertFalse(any('"content"' in sql or 'accounts_customuser' in sql for sql in queries))
+
+        # Cursors still work, since the ordering fields stay loaded.
+        response = self.client.get(response.data['next'])
+        self.assertEqual([post['title'] for post in response.data['results']], ['Post 0'])
+
+    def test_related_and_method_fields(self):
+        self.client.force_authenticate(user=self.author)
+        url = reverse('post-detail', args=[self.posts[0].pk]) + '?fields=author,liked_by_me,bogus'
+        response, queries = self.get(url)
+        self.assertEqual(response.data, {'author': 'author', 'liked_by_me': False})
+        self.assertFalse(any('"content"' in sql for sql in queries))
+
+    def test_writes_are_not_narrowed(self):
+        self.client.force_authenticate(user=self.author)
+        url = reverse('post-detail', args=[self.posts[0].pk]) + '?fields=id'
+        response = self.client.patch(url, {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content'], 'Long body')
+
+    def test_notifications_skip_unrequested_targets(self):
+        comment = Comment.objects.create(author=self.author, post=self.posts[0], content='Hi')
+        Notification.objects.create(recipient=self.author, actor=self.author, verb='commented', target=comment)
+        self.client.force_authenticate(user=self.author)
+        response, queries = self.get(reverse('notifications') + '?fields=id,summary')
+        self.assertEqual(response.data['results'][0]['summary'], 'author commented')
+        self.assertFalse(any('posts_comment' in sql for sql in queries))
@@ -1,16 +1,14 @@
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CommentViewSet, FeedView, LikePostView, UnlikePostView
+from .views import PostViewSet, CommentViewSet, FeedView, LikePostView, UnlikePostView, AutocompleteView
 from django.urls import path
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet, basename='post')
 router.register(r'comments', CommentViewSet, basename='comment')
 
-urlpatterns = router.urls
-
-
 urlpatterns = [
     path('feed/', FeedView.as_view(), name='feed'),
-     path('posts/<int:pk>/like/', LikePostView.as_view(), name='like-post'),
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    path('posts/<int:pk>/like/', LikePostView.as_view(), name='like-post'),
     path('posts/<int:pk>/unlike/', UnlikePostView.as_view(), name='unlike-post'),
-]
\ No newline at end of file
+] + router.urls
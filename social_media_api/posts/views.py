@@ -1,80 +1,144 @@
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from .models import Post, Comment, Like
+from .models import Post, Comment
 from .serializers import PostSerializer, CommentSerializer
 from .permissions import IsOwnerOrReadOnly
 from rest_framework import generics, permissions, status
-from notifications.models import Notification
-from django.contrib.contenttypes.models import ContentType
-from django.shortcuts import get_object_or_404
+from notifications.dispatch import enqueue
+from django.conf import settings
+from django.http import Http404
 from rest_framework.response import Response
+from . import autocomplete, cache
+from .counters import adjust_counter
+from .feed import fan_out_post, home_feed
+from .likes import like_post, liked_by, unlike_post
+from .mixins import CachedResponseMixin, ConditionalGetMixin, RelatedQuerysetMixin, SparseFieldsetMixin
+from .pagination import KeysetPagination
+from .search import FullTextSearchFilter
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(CachedResponseMixin, ConditionalGetMixin, SparseFieldsetMixin, RelatedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    pagination_class = KeysetPagination
+    select_related_fields = ('author',)
+    # Maintained with update(), which does not touch updated_at.
+    conditional_sum_fields = ('like_count', 'comment_count')
+    conditional_user_fields = ('liked_by_me',)
 
     # Filtering and search
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     search_fields = ['title', 'content']
 
+    def get_queryset(self):
+        return super().get_queryset().annotate(liked_by_me=liked_by(self.request.user))
+
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        fan_out_post(post)
 
 
 # in posts/views.py
-class CommentViewSet(viewsets.ModelViewSet):  # singular
+class CommentViewSet(ConditionalGetMixin, SparseFieldsetMixin, RelatedQuerysetMixin, viewsets.ModelViewSet):  # singular
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    pagination_class = KeysetPagination
+    select_related_fields = ('author',)
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['post']
     search_fields = ['content']
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        comment = serializer.save(author=self.request.user)
+        adjust_counter(comment.post_id, 'comment_count', 1)
+
+    def perform_update(self, serializer):
+        # A comment stays on the post it was created for, which keeps the
+        # denormalized comment_count correct.
+        serializer.save(post=serializer.instance.post)
 
-class FeedView(generics.ListAPIView):
+    def perform_destroy(self, instance):
+        post_id = instance.post_id
+        instance.delete()
+        adjust_counter(post_id, 'comment_count', -1)
+
+class FeedView(RelatedQuerysetMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-feed_at', '-id')
+    select_related_fields = ('author',)
 
     def get_queryset(self):
-      following_users = self.request.user.following.all()
-      return Post.objects.filter(author__in=following_users).order_by('-created_at')
+        # Reads the materialized timeline, merged with any pulled authors,
+        # instead of joining the follow graph.
+        user = self.request.user
+        return home_feed(user).annotate(liked_by_me=liked_by(user))
 
 
 class LikePostView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        post = generics.get_object_or_404(Post, pk=pk)
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
-        
-        if not created:
-            return Response({'detail': 'You already liked this post.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Create notification for post author
-        if post.author != request.user:
-            Notification.objects.create(
-                recipient=post.author,
-                actor=request.user,
-                verb='liked your post',
-                target_ct=ContentType.objects.get_for_model(post),
-                target_id=post.id
-            )
-
-        return Response({'detail': 'Post liked!'}, status=status.HTTP_201_CREATED)
+        result = like_post(request.user, pk)
+        if result is None:
+            raise Http404
+        created, like_count, author_id = result
+
+        # Queue a notification for the post author
+        if created:
+            # The raw SQL write sends no signals.
+            cache.bump(pk)
+            enqueue(author_id, request.user.pk, 'liked your post', Post(pk=pk))
+
+        return Response(
+            {'detail': 'Post liked!', 'liked': True, 'like_count': like_count},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
 
 class UnlikePostView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        post = generics.get_object_or_404(Post, pk=pk)
-        like = Like.objects.filter(user=request.user, post=post).first()
-        if like:
-            like.delete()
-            return Response({'detail': 'Post unliked!'}, status=status.HTTP_200_OK)
-        return Response({'detail': 'You have not liked this post.'}, status=status.HTTP_400_BAD_REQUEST)
+        result = unlike_post(request.user, pk)
+        if result is None:
+            raise Http404
+        deleted, like_count = result
+        if deleted:
+            cache.bump(pk)
+        return Response(
+            {'detail': 'Post unliked!', 'liked': False, 'like_count': like_count},
+            status=status.HTTP_200_OK
+        )
+
+
+class AutocompleteView(APIView):
+    """
+    Prefix matches for the mention picker and the search box.
+
+    ``?q=`` is matched case- and accent-insensitively against usernames and
+    against the start of any word in a post title. Served from in-memory
+    indexes, see ``posts.autocomplete``.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        max_results = getattr(settings, 'AUTOCOMPLETE_MAX_RESULTS', 10)
+        try:
+            limit = min(int(request.query_params.get('limit', max_results)), max_results)
+        except ValueError:
+            limit = max_results
+        return Response({
+            'users': [
+                {'id': pk, 'username': username}
+                for pk, username in autocomplete.users.search(query, limit)
+            ],
+            'posts': [
+                {'id': pk, 'title': title}
+                for pk, title in autocomplete.post_titles.search(query, limit)
+            ],
+        })
@@ -86,6 +86,17 @@ DATABASES = {
 }
 
 
+# Cache
+# Unread notification counters live here. Use a shared backend such as Redis
+# or Memcached when running more than one process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -122,10 +133,28 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 REST_FRAMEWORK = {
+    # orjson-backed when installed, stdlib json otherwise (see renderers.py).
+    'DEFAULT_RENDERER_CLASSES': [
+        'social_media_api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'social_media_api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Serializers pass datetimes through and the renderer encodes them.
+    'DATETIME_FORMAT': None,
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'accounts.authentication.CachedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
@@ -134,3 +163,69 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Home timeline fan-out
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_BACKFILL_LIMIT = 200
+# Authors with at least this many followers are pulled at read time instead
+# of fanned out on write. None disables pulling.
+FEED_PULL_FOLLOWER_THRESHOLD = 10000
+
+# Notifications
+# Fold notifications with the same recipient, verb and target into one row
+# when they arrive within this many seconds. None disables coalescing.
+NOTIFICATION_COALESCE_WINDOW = 60 * 60
+NOTIFICATION_ACTOR_SAMPLE_SIZE = 3
+# Store str(target) on each notification when it is dispatched.
+NOTIFICATION_SNAPSHOT_TARGET_REPR = True
+# Seconds a cached unread count is trusted before it is recounted.
+NOTIFICATION_UNREAD_CACHE_TTL = 300
+# Default age, in days, after which read notifications are pruned by
+# `manage.py prune_notifications`.
+NOTIFICATION_RETENTION_DAYS = 90
+# Live notification stream (GET /api/notifications/stream/). The tail broker
+# picks up rows written by the separate dispatch worker; InProcessBroker only
+# sees notifications created in the serving process.
+NOTIFICATIONS_PUBSUB_BACKEND = 'notifications.pubsub.DatabaseTailBroker'
+NOTIFICATIONS_PUBSUB_POLL_INTERVAL = 1.0
+# Seconds the tail broker looks back on each poll, for rows whose
+# transaction committed after later-stamped rows were already pushed.
+NOTIFICATIONS_PUBSUB_LOOKBACK = 5
+NOTIFICATIONS_STREAM_HEARTBEAT = 15
+
+# In-process follower graph (accounts.graph)
+# Upper bound on adjacency-list entries held per process (8 bytes each).
+FOLLOW_GRAPH_MAX_EDGES = 2_000_000
+# Seconds a resident list is trusted before it is reloaded.
+FOLLOW_GRAPH_LOCAL_TTL = 30
+# Seconds packed snapshots stay in the shared cache.
+FOLLOW_GRAPH_CACHE_TTL = 24 * 60 * 60
+
+# Most usernames accepted by one bulk follow request.
+FOLLOW_BULK_MAX_USERNAMES = 500
+
+# "People you may know" (accounts.suggestions)
+FOLLOW_SUGGESTIONS_PER_USER = 20
+# Seconds after which a candidate's last post counts half as much.
+FOLLOW_SUGGESTION_RECENCY_HALF_LIFE = 14 * 24 * 60 * 60
+
+# Token authentication cache (accounts.authentication)
+# Seconds a token lookup is reused by one process without asking the shared
+# cache; also how long other processes may honour a revoked token.
+TOKEN_AUTH_LOCAL_TTL = 10
+TOKEN_AUTH_LOCAL_MAX_SIZE = 10_000
+# Seconds a token lookup is kept in the shared cache.
+TOKEN_AUTH_CACHE_TTL = 300
+
+# Autocomplete (posts.autocomplete)
+AUTOCOMPLETE_MAX_RESULTS = 10
+# Seconds before a process reloads its prefix indexes to pick up changes
+# made by other processes.
+AUTOCOMPLETE_REFRESH_INTERVAL = 300
+# Index keys are cut to this many characters, bounding memory per title.
+AUTOCOMPLETE_MAX_KEY_LENGTH = 20
+
+# Seconds anonymous post list/detail responses stay cached (posts.cache).
+# Edits invalidate them immediately regardless.
+POST_RESPONSE_CACHE_TTL = 60
+# Seconds an unused version key behind those responses is kept.
+POST_VERSION_CACHE_TTL = 24 * 60 * 60